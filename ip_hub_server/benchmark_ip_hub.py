@@ -0,0 +1,166 @@
+#--------------------------------------------------------------------
+# IP Hub Benchmark
+# Jeffrey D. Shaffer and Generative-AI
+# 2026-10-18
+#
+# Notes:
+#    - Starts the IP hub on a spare local port with a throwaway
+#      database, then hammers it with a mix of /report_ip and
+#      /get_ip requests from many threads at once (just like every
+#      machine running send_ip.sh at boot)
+#    - Runs twice, both on the current ip_hub_server.py: once with
+#      its speed-ups switched off (a new sqlite3 connection per
+#      request, the default rollback journal and no lookup cache),
+#      then once with the connection pool, WAL mode and lookup cache.
+#      That shows what those three settings are worth, not how the
+#      current hub compares with an older version of ip_hub_server.py
+#      (everything else that changed is in both runs)
+#    - Usage:  python3 benchmark_ip_hub.py [threads] [requests_per_thread]
+#
+#    - The "list" mode registers lots of machines instead, then times
+#      full, filtered, paged and ETag (304) requests to /list_devices
+#    - Usage:  python3 benchmark_ip_hub.py list [machines]
+#
+#--------------------------------------------------------------------
+
+import contextlib
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from werkzeug.serving import make_server
+
+import ip_hub_server
+
+
+def start_server(database, pool_size, use_wal, cache_size):
+    """Starts the hub in a background thread and returns (server, base_url)."""
+    ip_hub_server.DATABASE = database
+    ip_hub_server.USE_WAL = use_wal
+    ip_hub_server.pool = ip_hub_server.ConnectionPool(database, pool_size)
+    ip_hub_server.cache = ip_hub_server.HostnameCache(cache_size)
+    ip_hub_server.init_db()
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)   # Hide werkzeug's access log
+    server = make_server('127.0.0.1', 0, ip_hub_server.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def client(base_url, worker_id, count, errors):
+    """Alternates between reporting this worker's IP and looking up another worker's."""
+    for i in range(count):
+        try:
+            if i % 2 == 0:
+                payload = json.dumps({"hostname": f"machine{worker_id}",
+                                      "ip_address": f"192.168.1.{i % 250}"}).encode()
+                req = urllib.request.Request(f"{base_url}/report_ip", data=payload,
+                                             headers={"Content-Type": "application/json"})
+            else:
+                req = urllib.request.Request(f"{base_url}/get_ip?hostname=machine{(worker_id + 1) % 4}")
+            with urllib.request.urlopen(req) as response:
+                response.read()
+        except Exception:
+            errors.append(1)
+
+
+def run(label, pool_size, use_wal, cache_size, threads, per_thread):
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, 'benchmark.db')
+        with contextlib.redirect_stdout(io.StringIO()):   # Hide the hub's per-request prints
+            server, base_url = start_server(database, pool_size, use_wal, cache_size)
+
+            # Make sure every looked-up hostname exists before timing starts
+            for worker_id in range(4):
+                client(base_url, worker_id, 1, [])
+
+            errors = []
+            workers = [threading.Thread(target=client, args=(base_url, n, per_thread, errors))
+                       for n in range(threads)]
+            start = time.perf_counter()
+            for w in workers:
+                w.start()
+            for w in workers:
+                w.join()
+            elapsed = time.perf_counter() - start
+
+            server.shutdown()
+            ip_hub_server.pool.close_all()
+
+    total = threads * per_thread
+    print(f"{label:<36} {total / elapsed:>8.0f} req/s   ({total} requests, {len(errors)} errors)")
+
+
+def timed_get(url, repeats, headers=None):
+    """Returns (milliseconds per request, status, ETag) for repeated GETs of one URL."""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, headers=headers or {})) as response:
+                response.read()
+                status, etag = response.status, response.headers.get('ETag')
+        except urllib.error.HTTPError as e:   # urllib treats 304 as an error
+            status, etag = e.code, e.headers.get('ETag')
+    return (time.perf_counter() - start) * 1000 / repeats, status, etag
+
+
+def run_listing(machines, repeats=20):
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, 'benchmark.db')
+        with contextlib.redirect_stdout(io.StringIO()):
+            server, base_url = start_server(database, ip_hub_server.POOL_SIZE, True, ip_hub_server.CACHE_SIZE)
+
+            for start in range(0, machines, 1000):
+                reports = [{"hostname": f"machine{n:06d}", "ip_address": f"10.{n // 65536}.{n // 256 % 256}.{n % 256}"}
+                           for n in range(start, min(start + 1000, machines))]
+                req = urllib.request.Request(f"{base_url}/report_ips", data=json.dumps(reports).encode(),
+                                             headers={"Content-Type": "application/json"})
+                urllib.request.urlopen(req).read()
+
+            url = f"{base_url}/list_devices"
+            results = []
+            # The very first listing has to query and encode everything
+            results.append(("Full list (first request)",) + timed_get(url, 1))
+            results.append(("Full list (repeat, from memory)",) + timed_get(url, repeats))
+            etag = results[-1][3]
+            results.append(("Full list with If-None-Match",) + timed_get(url, repeats, {"If-None-Match": etag}))
+            results.append(("Full list with details (first)",) + timed_get(url + "?details=1", 1))
+            results.append(("Prefix filter (first)",) + timed_get(url + "?prefix=machine0001", 1))
+            results.append(("One page of 100 (first)",) + timed_get(url + "?limit=100&cursor=machine005000", 1))
+
+            # Walk every page, like a client syncing the whole table
+            start = time.perf_counter()
+            cursor, pages = '', 0
+            while cursor is not None:
+                with urllib.request.urlopen(f"{url}?limit=500&cursor={cursor}") as response:
+                    cursor = json.loads(response.read())["next_cursor"]
+                pages += 1
+            results.append((f"All {pages} pages of 500", (time.perf_counter() - start) * 1000, 200, None))
+
+            server.shutdown()
+            ip_hub_server.pool.close_all()
+
+    print(f"/list_devices with {machines} machines")
+    for label, ms, status, _ in results:
+        print(f"{label:<36} {ms:>9.2f} ms   (HTTP {status})")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'list':
+        run_listing(int(sys.argv[2]) if len(sys.argv) > 2 else 10000)
+        sys.exit(0)
+
+    THREADS = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    PER_THREAD = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    print(f"{THREADS} threads x {PER_THREAD} requests (half POST /report_ip, half GET /get_ip)")
+    run("Off: connect per request, no cache", 0, False, 0, THREADS, PER_THREAD)
+    run("On:  pool + WAL + lookup cache", ip_hub_server.POOL_SIZE, True,
+        ip_hub_server.CACHE_SIZE, THREADS, PER_THREAD)
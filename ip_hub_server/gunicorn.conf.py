@@ -0,0 +1,59 @@
+#--------------------------------------------------------------------
+# Gunicorn Settings for the IP Hub
+# Jeffrey D. Shaffer and Generative-AI
+# 2026-10-18
+#
+# Notes:
+#    - Runs ip_hub_server.py with several worker processes instead
+#      of Flask's single-process development server
+#    - Requires the "gunicorn" python module:
+#         pip install gunicorn
+#    - Start it from the ip_hub_server folder with:
+#         gunicorn -c gunicorn.conf.py ip_hub_server:app
+#    - Graceful reload (new workers start before the old ones finish
+#      their requests and exit, and they load any updated code):
+#         kill -HUP <gunicorn master pid>
+#         sudo systemctl reload ip-hub.service
+#    - Any setting below can be overridden on the command line,
+#      for example:  --workers 2  or  --bind 127.0.0.1:5050
+#
+#--------------------------------------------------------------------
+
+import multiprocessing
+
+
+# --- Serving ---
+bind              = '0.0.0.0:5000'
+workers           = min(multiprocessing.cpu_count(), 4)   # A Raspberry Pi has 4 cores
+worker_class      = 'gthread'   # Threaded workers, needed for keep-alive
+threads           = 8           # Requests each worker can handle at the same time (a waiting /watch uses one)
+keepalive         = 5           # Seconds an idle connection is kept open
+graceful_timeout  = 30          # Seconds old workers get to finish up on reload/stop
+preload_app       = False       # Each worker imports the app itself, so a reload picks up new code
+
+
+# --- Logging (goes to syslog through systemd, like before) ---
+accesslog = None
+errorlog  = '-'
+
+
+def post_worker_init(worker):
+    """Runs inside each new worker once the app has been imported."""
+    import ip_hub_server
+
+    # Several processes now write to the same sqlite3 file, so each worker
+    # has to notice changes made by the others before trusting its cache
+    ip_hub_server.SHARED_DATABASE = True
+    ip_hub_server.init_db()
+
+    # Watch for missing heartbeats from the start, even if none ever arrive
+    # (every worker runs one, but each email is only sent once)
+    ip_hub_server.heartbeat_watch.start()
+
+
+def worker_exit(server, worker):
+    """Runs as a worker shuts down (stop, reload, or restart)."""
+    import ip_hub_server
+
+    # Write out any "last updated" times still waiting in memory
+    ip_hub_server.last_seen.flush()
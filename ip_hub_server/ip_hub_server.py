@@ -1,7 +1,7 @@
 #--------------------------------------------------------------------
-# IP Hub Server -- Version 1.1
+# IP Hub Server -- Version 2.0
 # Jeffrey D. Shaffer and Generative-AI
-# 2025-12-24
+# 2026-10-18
 #
 # Notes:
 #    - This python program runs a simple flask webserver
@@ -12,30 +12,728 @@
 #      IP address and sends it back
 #    - Running "getIP list" now returns a list of logged machines
 #
+# 2026-10-18
+#    - Requests now borrow an already-open sqlite3 connection from
+#      a small pool instead of opening a new one every time
+#    - The database runs in WAL mode, so lookups no longer wait
+#      behind the reports every machine sends at boot
+#    - benchmark_ip_hub.py times the hub with the pool and WAL
+#      (and lookup cache) switched off and on
+#    - Recently looked-up machines are kept in a small in-memory
+#      cache, so repeat lookups never touch the disk. Reports update
+#      the cache as they are written. Hit/miss counts are shown at
+#      /cache_stats
+#    - Added /report_ips and /get_ips so a gateway can report or
+#      look up many machines in a single request
+#    - For everyday use the hub can now run under gunicorn with
+#      several worker processes (see gunicorn.conf.py). Running
+#      this file directly still starts the simple Flask server
+#    - Reports that repeat the IP the hub already has no longer
+#      rewrite the database. Their "last updated" time is kept in
+#      memory and written out in one batch every few minutes, which
+#      saves a lot of wear on the Raspberry Pi's SD card
+#    - Added /watch, which waits for IP changes and returns them as
+#      they happen, so a client can keep its own copy of every
+#      machine's IP without asking over and over. Call it once with
+#      no cursor to get everything, then keep passing back the
+#      cursor it returns
+#    - Those IP changes are now also kept as a history (a year by
+#      default). /history?hostname=raspi&since=2026-10-13&until=2026-10-14
+#      shows what a machine's address was and how often it changed
+#    - /list_devices can now page (?limit=&cursor=), filter
+#      (?prefix=ras or ?match=ras*), and include each machine's IP
+#      (?details=1). It sends an ETag, so asking again with
+#      If-None-Match gets a quick "304 Not Modified" until a machine
+#      is added or changes
+#    - Added /metrics (Prometheus text format) with request timings,
+#      database time, status codes, and cache/database stats. Set
+#      SLOW_REQUEST_SECONDS to log any request slower than that
+#    - Added /heartbeat, where heartbeat_agent.py on each machine
+#      sends its uptime, load, memory, disk and battery every few
+#      minutes. The hub keeps them (HEARTBEAT_KEEP_DAYS), emails one
+#      summary of every machine a day (HEARTBEAT_DIGEST_HOUR), and
+#      otherwise only emails when a machine stops checking in or comes
+#      back. Emails go through notify_queue.py / notify_daemon.py.
+#      /heartbeats shows every machine's latest sample, or one
+#      machine's samples with ?hostname=
+#
 #--------------------------------------------------------------------
 
 import sqlite3
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
 import os
+import sys
 import datetime
+import queue
+import threading
+import time
+import atexit
+import bisect
+from collections import OrderedDict
+from contextlib import contextmanager
 
 app = Flask(__name__)
 DATABASE = 'ip_addresses.db'
 
+# --- Configuration for the Database Connections ---
+POOL_SIZE       =    8   # Idle connections kept open (0 = new connection for every request)
+BUSY_TIMEOUT_MS = 5000   # How long to wait on a locked database before giving up
+USE_WAL         = True   # WAL lets lookups run while a report is being written
+
+# --- Configuration for the Lookup Cache ---
+CACHE_SIZE      =  256   # Most machines remembered in memory (0 = no cache)
+SHARED_DATABASE = False  # Set by gunicorn.conf.py when several worker processes share the database
+
+# --- Configuration for Unchanged Reports ---
+LAST_SEEN_FLUSH_SECONDS = 300   # How often "last updated" times for unchanged IPs are written to disk
+
+# --- Configuration for the Change Feed (/watch) ---
+WATCH_TIMEOUT_SECONDS =    30   # Longest a /watch request waits for a change
+WATCH_POLL_SECONDS    =     1   # How often a waiting /watch checks for changes made by other workers
+WATCH_BATCH_SIZE      =   500   # Most changes returned by a single /watch
+
+# --- Configuration for the IP History (/history) ---
+HISTORY_KEEP_DAYS     =    365   # IP changes older than this are deleted
+HISTORY_KEEP_ROWS     = 100000   # ...and never more than this many are kept
+HISTORY_PRUNE_SECONDS =   3600   # How often old history is cleared out (while saving a report)
+HISTORY_PAGE_SIZE     =    100   # Default (and HISTORY_PAGE_SIZE * 10 maximum) rows per /history page
+
+# --- Configuration for /list_devices ---
+LIST_PAGE_LIMIT       =   5000   # Largest ?limit= allowed
+LIST_BODY_CACHE_SIZE  =     64   # Encoded listings kept in memory until the devices table changes
+
+# --- Configuration for /metrics ---
+SLOW_REQUEST_SECONDS  =   None   # Log requests slower than this many seconds (None = off)
+# Histogram bucket upper bounds, in seconds
+METRICS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# --- Configuration for Heartbeats (/heartbeat) ---
+HEARTBEAT_MISSED_AFTER  =     3   # A machine is "missing" once this many of its heartbeats haven't arrived
+HEARTBEAT_CHECK_SECONDS =    60   # How often to look for missing machines
+HEARTBEAT_KEEP_DAYS     =    90   # Samples older than this are deleted
+HEARTBEAT_DIGEST_HOUR   =    12   # Hour of the day the summary email goes out (None = no summary)
+HEARTBEAT_PAGE_SIZE     =  1000   # Most samples returned by /heartbeats?hostname=
+HEARTBEAT_EVERY         =   300   # Seconds between heartbeats, if a machine doesn't say
+NOTIFY_FOLDER = os.path.join(os.path.expanduser('~'), 'jds-programs')   # Where notify_queue.py lives
+
+# Every pooled connection keeps its own prepared-statement cache keyed on the
+# SQL text, so the handlers reuse these exact strings instead of rebuilding them
+SQL_REPORT_IP = '''
+    INSERT OR REPLACE INTO devices (hostname, ip_address, last_updated)
+    VALUES (?, ?, ?)
+'''
+SQL_GET_IP = 'SELECT ip_address, last_updated FROM devices WHERE hostname = ?'
+SQL_GET_IPS = 'SELECT hostname, ip_address, last_updated FROM devices WHERE hostname IN ({})'
+MAX_SQL_VARIABLES = 500   # Stay well under sqlite's limit on "?" placeholders per query
+SQL_LIST_DEVICES = 'SELECT hostname, ip_address, last_updated FROM devices WHERE hostname > ?{} ORDER BY hostname{}'
+SQL_GET_VERSION = "SELECT value FROM hub_meta WHERE key = 'devices_version'"
+SQL_BUMP_VERSION = "UPDATE hub_meta SET value = value + 1 WHERE key = 'devices_version'"
+SQL_ALL_DEVICES = 'SELECT hostname, ip_address, last_updated FROM devices ORDER BY hostname'
+SQL_RECORD_CHANGE = 'INSERT INTO ip_changes (hostname, ip_address, changed_at) VALUES (?, ?, ?)'
+# seq and changed_at both only go up, so everything older than the first row worth keeping can go
+SQL_PRUNE_CHANGES = '''
+    DELETE FROM ip_changes WHERE seq < (
+        SELECT seq FROM ip_changes
+        WHERE changed_at >= ? AND seq > (SELECT MAX(seq) FROM ip_changes) - ?
+        ORDER BY seq LIMIT 1
+    )
+'''
+SQL_CHANGE_RANGE = 'SELECT MIN(seq), MAX(seq) FROM ip_changes'
+SQL_CHANGES_SINCE = '''
+    SELECT seq, hostname, ip_address, changed_at FROM ip_changes
+    WHERE seq > ? ORDER BY seq LIMIT ?
+'''
+# Both use the (hostname, changed_at) index; the row value comparison lets pages pick up where they left off
+SQL_HISTORY_PAGE = '''
+    SELECT seq, ip_address, changed_at FROM ip_changes
+    WHERE hostname = ? AND changed_at <= ? AND (changed_at, seq) > (?, ?)
+    ORDER BY changed_at, seq LIMIT ?
+'''
+SQL_HISTORY_BEFORE = '''
+    SELECT ip_address, changed_at FROM ip_changes
+    WHERE hostname = ? AND changed_at < ?
+    ORDER BY changed_at DESC LIMIT 1
+'''
+# Only moves the time forward, and skips machines whose IP has changed since
+SQL_TOUCH_LAST_SEEN = '''
+    UPDATE devices SET last_updated = ?
+    WHERE hostname = ? AND ip_address = ? AND last_updated < ?
+'''
+HEARTBEAT_COLUMNS = ('uptime', 'load1', 'load5', 'load15', 'mem_total_kb', 'mem_available_kb',
+                     'disk_total', 'disk_free', 'battery', 'battery_status')
+SQL_SAVE_HEARTBEAT = f'''
+    INSERT OR REPLACE INTO heartbeats (hostname, sampled_at, {', '.join(HEARTBEAT_COLUMNS)})
+    VALUES (?, ?, {', '.join('?' * len(HEARTBEAT_COLUMNS))})
+'''
+# Clears "missing" only if it was set, so exactly one "back online" email is sent
+SQL_HEARTBEAT_BACK = 'UPDATE heartbeat_machines SET missing = 0 WHERE hostname = ? AND missing = 1'
+SQL_HEARTBEAT_SEEN = '''
+    INSERT INTO heartbeat_machines (hostname, last_seen, every) VALUES (?, ?, ?)
+    ON CONFLICT (hostname) DO UPDATE SET last_seen = excluded.last_seen, every = excluded.every
+'''
+SQL_HEARTBEAT_OVERDUE = '''
+    SELECT hostname, last_seen FROM heartbeat_machines
+    WHERE missing = 0 AND last_seen < ? - every * ?
+'''
+# Only one worker gets a row count of 1, so only one of them sends the email
+SQL_HEARTBEAT_MARK_MISSING = 'UPDATE heartbeat_machines SET missing = 1 WHERE hostname = ? AND missing = 0'
+SQL_CLAIM_DIGEST = "UPDATE hub_meta SET value = ? WHERE key = 'heartbeat_digest_day' AND value < ?"
+SQL_LATEST_HEARTBEATS = f'''
+    SELECT m.hostname, m.last_seen, m.every, m.missing, {', '.join('h.' + c for c in HEARTBEAT_COLUMNS)}
+    FROM heartbeat_machines m LEFT JOIN heartbeats h
+    ON h.hostname = m.hostname AND h.sampled_at = m.last_seen
+    ORDER BY m.hostname
+'''
+SQL_HEARTBEAT_HISTORY = f'''
+    SELECT sampled_at, {', '.join(HEARTBEAT_COLUMNS)} FROM heartbeats
+    WHERE hostname = ? AND sampled_at >= ? ORDER BY sampled_at LIMIT ?
+'''
+SQL_PRUNE_HEARTBEATS = 'DELETE FROM heartbeats WHERE sampled_at < ?'
+
+
+class ConnectionPool:
+    """A small, thread-safe pool of open sqlite3 connections."""
+
+    def __init__(self, database, size):
+        self.database = database
+        self.size = size
+        self._idle = queue.LifoQueue(maxsize=max(size, 1))
+
+    def _open(self):
+        conn = sqlite3.connect(self.database, timeout=BUSY_TIMEOUT_MS / 1000,
+                               check_same_thread=False, cached_statements=32)
+        conn.execute(f'PRAGMA busy_timeout = {int(BUSY_TIMEOUT_MS)}')
+        if USE_WAL:
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')   # Safe with WAL; only fsyncs at checkpoints
+        return conn
+
+    @property
+    def idle_count(self):
+        return self._idle.qsize()
+
+    @contextmanager
+    def connection(self):
+        """Borrows a connection, committing on success and rolling back on error."""
+        start = time.perf_counter()
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._open()
+        try:
+            with conn:
+                yield conn
+        finally:
+            metrics.observe_db(time.perf_counter() - start)
+            if self.size > 0:
+                try:
+                    self._idle.put_nowait(conn)
+                    conn = None
+                except queue.Full:
+                    pass
+            if conn is not None:
+                conn.close()
+
+    def close_all(self):
+        """Closes every idle connection."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class HostnameCache:
+    """A thread-safe, size-bounded LRU cache of hostname -> (ip_address, last_updated)."""
+
+    def __init__(self, size):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, hostname):
+        """Returns the cached (ip_address, last_updated), or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(hostname)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(hostname)
+            self.hits += 1
+            return entry
+
+    def put(self, hostname, ip_address, last_updated, replace=True):
+        """
+        Stores an entry. Lookups fill the cache with replace=False so a slow
+        read can never overwrite a newer IP that a report has just stored.
+        """
+        if self.size <= 0:
+            return
+        with self._lock:
+            if not replace and hostname in self._entries:
+                return
+            self._entries[hostname] = (ip_address, last_updated)
+            self._entries.move_to_end(hostname)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)   # Evict the least recently used
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+class LastSeenBuffer:
+    """
+    Holds the "last updated" times of machines that re-reported an unchanged IP,
+    so they can be written to the database together instead of one write each.
+    """
+
+    def __init__(self, flush_seconds):
+        self.flush_seconds = flush_seconds
+        self._pending = {}   # hostname -> (ip_address, last_seen)
+        self._lock = threading.Lock()
+        self._flusher = None
+
+    def note(self, hostname, ip_address, last_seen):
+        with self._lock:
+            self._pending[hostname] = (ip_address, last_seen)
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_forever, daemon=True)
+                self._flusher.start()
+
+    @property
+    def pending_count(self):
+        return len(self._pending)
+
+    def discard(self, hostname):
+        """Forgets a pending time once the machine's new IP has been written."""
+        with self._lock:
+            self._pending.pop(hostname, None)
+
+    def freshen(self, hostname, result):
+        """Returns (ip_address, last_updated) with any newer, not-yet-saved time."""
+        with self._lock:
+            entry = self._pending.get(hostname)
+        if entry and entry[0] == result[0] and entry[1] > result[1]:
+            return entry
+        return result
+
+    def flush(self):
+        """Writes every pending time in a single transaction."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        rows = [(seen, hostname, ip_address, seen) for hostname, (ip_address, seen) in pending.items()]
+        try:
+            with pool.connection() as conn:
+                conn.executemany(SQL_TOUCH_LAST_SEEN, rows)
+                conn.execute(SQL_BUMP_VERSION)
+            forget_devices_version()
+        except sqlite3.Error:
+            with self._lock:
+                for hostname, entry in pending.items():
+                    self._pending.setdefault(hostname, entry)   # Keep anything newer that arrived meanwhile
+            raise
+        return len(rows)
+
+    def _flush_forever(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            try:
+                count = self.flush()
+                if count:
+                    print(f"Saved last-seen times for {count} unchanged machines")
+            except sqlite3.Error as e:
+                print(f"Database error while saving last-seen times: {e}")
+
+
+class ChangeFeed:
+    """Wakes up waiting /watch requests when this process saves a new IP."""
+
+    def __init__(self):
+        self.generation = 0
+        self._changed = threading.Condition()
+
+    def notify(self):
+        with self._changed:
+            self.generation += 1
+            self._changed.notify_all()
+
+    def wait(self, generation, timeout):
+        """Waits until notify() is called after 'generation' was read, or the timeout passes."""
+        with self._changed:
+            return self._changed.wait_for(lambda: self.generation != generation, timeout)
+
+
+class HeartbeatWatch:
+    """
+    Looks for machines that have stopped sending heartbeats, sends the daily
+    summary, and clears out old samples. Every worker runs one, but each email
+    is claimed in the database first, so it's only ever sent once.
+    """
+
+    def __init__(self, check_seconds):
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._checker = None
+        self._next_prune = 0.0
+
+    def start(self):
+        with self._lock:
+            if self._checker is None:
+                self._checker = threading.Thread(target=self._check_forever, daemon=True)
+                self._checker.start()
+
+    def check(self, now=None):
+        """Emails about machines that have just gone missing, and the summary once a day."""
+        now = int(now or time.time())
+        today = datetime.datetime.fromtimestamp(now)
+        digest = None
+        with pool.connection() as conn:
+            overdue = conn.execute(SQL_HEARTBEAT_OVERDUE, (now, HEARTBEAT_MISSED_AFTER)).fetchall()
+            missing = [(hostname, last_seen) for hostname, last_seen in overdue
+                       if conn.execute(SQL_HEARTBEAT_MARK_MISSING, (hostname,)).rowcount == 1]
+
+            if HEARTBEAT_DIGEST_HOUR is not None and today.hour >= HEARTBEAT_DIGEST_HOUR:
+                day = today.toordinal()
+                if conn.execute(SQL_CLAIM_DIGEST, (day, day)).rowcount == 1:
+                    # Written out here, so if it fails the claim is rolled back and tried again
+                    digest = conn.execute(SQL_LATEST_HEARTBEATS).fetchall()
+                    digest_lines = [describe_machine(row) for row in digest]
+
+            # Clearing out old samples rides along with a check that's happening anyway
+            if time.monotonic() >= self._next_prune:
+                self._next_prune = time.monotonic() + 3600
+                conn.execute(SQL_PRUNE_HEARTBEATS, (now - HEARTBEAT_KEEP_DAYS * 86400,))
+
+        if missing:
+            names = ', '.join(hostname for hostname, _ in missing)
+            lines = [f"{hostname} hasn't sent a heartbeat since {format_time(last_seen)}."
+                     for hostname, last_seen in missing]
+            send_notification(f"Missing heartbeat: {names}", '\n'.join(lines))
+        if digest:
+            lost = sum(1 for row in digest if row[3])
+            status = f"{lost} missing" if lost else "all well"
+            send_notification(f"Daily heartbeat summary ({len(digest)} machines, {status})", '\n'.join(digest_lines))
+        return [hostname for hostname, _ in missing]
+
+    def _check_forever(self):
+        while True:
+            time.sleep(self.check_seconds)
+            try:
+                self.check()
+            except sqlite3.Error as e:
+                print(f"Database error while checking heartbeats: {e}")
+            except Exception as e:   # Keep checking, or missing machines would never be noticed again
+                print(f"An unexpected error occurred while checking heartbeats: {e!r}")
+
+
+class Histogram:
+    """Counts of observed durations per bucket, plus their total (not thread-safe on its own)."""
+
+    def __init__(self):
+        self.buckets = [0] * (len(METRICS_BUCKETS) + 1)   # The last one is "+Inf"
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.buckets[bisect.bisect_left(METRICS_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, bucket in zip(METRICS_BUCKETS + ('+Inf',), self.buckets):
+            cumulative += bucket
+            lines.append(f'{name}_bucket{{{labels}le="{bound}"}} {cumulative}')
+        plain = f'{{{labels.rstrip(",")}}}' if labels else ''
+        lines.append(f'{name}_sum{plain} {self.total:.6f}')
+        lines.append(f'{name}_count{plain} {self.count}')
+        return lines
+
+
+class Metrics:
+    """
+    Request and database timings for /metrics. Recording is a lock, a bisect
+    and a few additions, so it's cheap enough to leave on all the time.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._routes = {}     # route -> Histogram
+        self._statuses = {}   # (route, status) -> count
+        self._db = Histogram()
+
+    def observe_request(self, route, status, seconds):
+        with self._lock:
+            histogram = self._routes.get(route)
+            if histogram is None:
+                histogram = self._routes[route] = Histogram()
+            histogram.observe(seconds)
+            self._statuses[(route, status)] = self._statuses.get((route, status), 0) + 1
+
+    def observe_db(self, seconds):
+        with self._lock:
+            self._db.observe(seconds)
+
+    def render(self):
+        """Returns everything in Prometheus' text format."""
+        lines = [
+            '# HELP iphub_request_duration_seconds Time spent handling requests, by route.',
+            '# TYPE iphub_request_duration_seconds histogram',
+        ]
+        with self._lock:
+            for route, histogram in sorted(self._routes.items()):
+                lines += histogram.render('iphub_request_duration_seconds', f'route="{route}",')
+            lines += [
+                '# HELP iphub_requests_total Requests handled, by route and status code.',
+                '# TYPE iphub_requests_total counter',
+            ]
+            for (route, status), count in sorted(self._statuses.items()):
+                lines.append(f'iphub_requests_total{{route="{route}",status="{status}"}} {count}')
+            lines += [
+                '# HELP iphub_db_duration_seconds Time each request held a database connection.',
+                '# TYPE iphub_db_duration_seconds histogram',
+            ]
+            lines += self._db.render('iphub_db_duration_seconds', '')
+
+        stats = cache.stats()
+        try:
+            database_bytes = os.path.getsize(DATABASE)
+        except OSError:
+            database_bytes = 0
+        gauges = [
+            ('iphub_cache_hits_total', 'counter', 'Lookups answered from the cache.', stats["hits"]),
+            ('iphub_cache_misses_total', 'counter', 'Lookups that had to ask the database.', stats["misses"]),
+            ('iphub_cache_entries', 'gauge', 'Machines currently in the cache.', stats["size"]),
+            ('iphub_pool_idle_connections', 'gauge', 'Open database connections waiting to be used.', pool.idle_count),
+            ('iphub_last_seen_pending', 'gauge', 'Unchanged reports waiting to be written.', last_seen.pending_count),
+            ('iphub_database_bytes', 'gauge', 'Size of the sqlite3 database file.', database_bytes),
+            ('iphub_start_time_seconds', 'gauge', 'When this process started (Unix time).', round(self.started)),
+        ]
+        for name, kind, help_text, value in gauges:
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}', f'{name} {value}']
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+pool = ConnectionPool(DATABASE, POOL_SIZE)
+cache = HostnameCache(CACHE_SIZE)
+last_seen = LastSeenBuffer(LAST_SEEN_FLUSH_SECONDS)
+change_feed = ChangeFeed()
+heartbeat_watch = HeartbeatWatch(HEARTBEAT_CHECK_SECONDS)
+_next_history_prune = 0.0
+atexit.register(last_seen.flush)   # Don't lose pending times when the hub stops
+
+_version_lock = threading.Lock()
+_version_conn = None
+_seen_version = None
+_devices_version = None   # This process's copy of hub_meta's devices_version (None = read it again)
+_devices_forgotten = 0    # Bumped by forget_devices_version(), to spot writes that race a listing
+_list_bodies = {}         # (devices_version, query string) -> encoded /list_devices response
+
+
+def sync_cache_with_other_workers():
+    """
+    When several worker processes share the database, another worker may have
+    changed a machine this worker has cached. SQLite bumps "data_version" on a
+    connection whenever any other connection commits, so it's a cheap way to
+    know when the cache has to be dropped.
+    """
+    global _version_conn, _seen_version
+    if not SHARED_DATABASE:
+        return
+    with _version_lock:
+        if _version_conn is None:
+            _version_conn = sqlite3.connect(DATABASE, check_same_thread=False)
+        version = _version_conn.execute('PRAGMA data_version').fetchone()[0]
+        if version != _seen_version:
+            cache.clear()
+            forget_devices_version()
+            _seen_version = version
+
+
+def forget_devices_version():
+    """Called after the devices table changes, so the next listing re-reads the version."""
+    global _devices_version, _devices_forgotten
+    _devices_version = None
+    _devices_forgotten += 1
+
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_timing(response):
+    elapsed = time.perf_counter() - g.get('request_start', time.perf_counter())
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.observe_request(route, response.status_code, elapsed)
+    if SLOW_REQUEST_SECONDS is not None and elapsed >= SLOW_REQUEST_SECONDS:
+        print(f"Slow request: {request.method} {request.full_path.rstrip('?')} -> {response.status_code} in {elapsed * 1000:.1f} ms")
+    return response
+
+
 def init_db():
     """Initializes the database if it doesn't exist."""
-    with sqlite3.connect(DATABASE) as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
+    with pool.connection() as conn:
+        conn.execute('''
             CREATE TABLE IF NOT EXISTS devices (
                 hostname TEXT PRIMARY KEY,
                 ip_address TEXT NOT NULL,
                 last_updated TEXT NOT NULL
             )
         ''')
-        conn.commit()
+        # Every new or changed IP, in order, for /watch and /history (AUTOINCREMENT so a seq is never reused)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS ip_changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                hostname TEXT NOT NULL,
+                ip_address TEXT NOT NULL,
+                changed_at TEXT NOT NULL
+            )
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS ip_changes_by_hostname
+            ON ip_changes (hostname, changed_at)
+        ''')
+        # devices_version goes up with every write to devices, and is used as the /list_devices ETag
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS hub_meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        ''')
+        conn.execute("INSERT OR IGNORE INTO hub_meta (key, value) VALUES ('devices_version', 0)")
+        # Heartbeat samples, kept in (hostname, time) order so one machine's history reads straight off disk
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS heartbeats (
+                hostname TEXT NOT NULL,
+                sampled_at INTEGER NOT NULL,
+                uptime INTEGER, load1 REAL, load5 REAL, load15 REAL,
+                mem_total_kb INTEGER, mem_available_kb INTEGER,
+                disk_total INTEGER, disk_free INTEGER,
+                battery INTEGER, battery_status TEXT,
+                PRIMARY KEY (hostname, sampled_at)
+            ) WITHOUT ROWID
+        ''')
+        # The newest heartbeat of each machine, how often it promised to send one, and whether it's missing
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS heartbeat_machines (
+                hostname TEXT PRIMARY KEY,
+                last_seen INTEGER NOT NULL,
+                every INTEGER NOT NULL,
+                missing INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        conn.execute("INSERT OR IGNORE INTO hub_meta (key, value) VALUES ('heartbeat_digest_day', 0)")
     print(f"Database '{DATABASE}' initialized.")
 
+
+def lookup_ip(hostname):
+    """Returns (ip_address, last_updated) for a hostname, or None if it's unknown."""
+    sync_cache_with_other_workers()
+    result = cache.get(hostname)
+    if result is None:
+        with pool.connection() as conn:
+            result = conn.execute(SQL_GET_IP, (hostname,)).fetchone()
+        if result:
+            cache.put(hostname, *result, replace=False)
+    if result:
+        result = last_seen.freshen(hostname, result)
+    return result
+
+
+def store_reports(rows):
+    """
+    Saves a list of (hostname, ip_address, current_time) reports.
+    New or changed IPs are written straight away in one transaction. Unchanged
+    IPs only have their time noted in memory. Returns the number written.
+    """
+    changed = []
+    for hostname, ip_address, current_time in rows:
+        known = lookup_ip(hostname)
+        if known and known[0] == ip_address:
+            last_seen.note(hostname, ip_address, current_time)
+            cache.put(hostname, ip_address, current_time)
+        else:
+            changed.append((hostname, ip_address, current_time))
+
+    if changed:
+        global _next_history_prune
+        with pool.connection() as conn:
+            conn.executemany(SQL_REPORT_IP, changed)
+            conn.executemany(SQL_RECORD_CHANGE, changed)
+            conn.execute(SQL_BUMP_VERSION)
+            # Clearing out old history rides along with a write that's happening anyway
+            if time.monotonic() >= _next_history_prune:
+                _next_history_prune = time.monotonic() + HISTORY_PRUNE_SECONDS
+                cutoff = (datetime.datetime.now() - datetime.timedelta(days=HISTORY_KEEP_DAYS)).isoformat()
+                conn.execute(SQL_PRUNE_CHANGES, (cutoff, HISTORY_KEEP_ROWS))
+        for hostname, ip_address, current_time in changed:   # Only after the write has committed
+            last_seen.discard(hostname)
+            cache.put(hostname, ip_address, current_time)
+        forget_devices_version()
+        change_feed.notify()
+    return len(changed)
+
+
+def format_time(unix_time):
+    return datetime.datetime.fromtimestamp(unix_time).isoformat(timespec='seconds')
+
+
+def describe_machine(row):
+    """One line of the daily summary, from a row of SQL_LATEST_HEARTBEATS."""
+    hostname, last_seen, _, missing = row[:4]
+    sample = dict(zip(HEARTBEAT_COLUMNS, row[4:]))
+    if missing:
+        return f"{hostname:<12}  MISSING since {format_time(last_seen)}"
+    parts = [f"{hostname:<12}"]
+    if sample['uptime'] is not None:
+        parts.append(f"up {sample['uptime'] // 86400}d {sample['uptime'] % 86400 // 3600}h")
+    if sample['load1'] is not None:
+        parts.append(f"load {sample['load1']:.2f}")
+    if sample['mem_total_kb']:
+        parts.append(f"memory {100 - 100 * sample['mem_available_kb'] / sample['mem_total_kb']:.0f}% used")
+    if sample['disk_total']:
+        parts.append(f"disk {100 - 100 * sample['disk_free'] / sample['disk_total']:.0f}% used")
+    if sample['battery'] is not None:
+        parts.append(f"battery {sample['battery']}% ({sample['battery_status']})")
+    parts.append(f"last heard from at {format_time(last_seen)[11:16]}")
+    return '  '.join(parts)
+
+
+def send_notification(subject, body):
+    """
+    Leaves an email for notify_daemon.py to send (through notify_queue.py),
+    or just logs it if notify_queue.py isn't installed on the hub.
+    """
+    try:
+        if NOTIFY_FOLDER not in sys.path:
+            sys.path.append(NOTIFY_FOLDER)
+        from notify_queue import queue_email
+        queue_email(subject, body)
+        print(f"Queued email: {subject}")
+    except (ImportError, OSError) as e:
+        print(f"Couldn't queue the email \"{subject}\" ({e}):\n{body}")
+
 @app.route('/report_ip', methods=['POST'])
 def report_ip():
     """
@@ -46,23 +744,20 @@ def report_ip():
         return jsonify({"error": "Request must be JSON"}), 400
 
     data = request.get_json()
-    hostname = data.get('hostname')
-    ip_address = data.get('ip_address')
+    hostname = data.get('hostname') if isinstance(data, dict) else None
+    ip_address = data.get('ip_address') if isinstance(data, dict) else None
 
     if not hostname or not ip_address:
         return jsonify({"error": "Missing hostname or ip_address"}), 400
+    if not isinstance(hostname, str) or not isinstance(ip_address, str):
+        return jsonify({"error": "hostname and ip_address must be strings"}), 400
 
     current_time = datetime.datetime.now().isoformat()
 
     try:
-        with sqlite3.connect(DATABASE) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT OR REPLACE INTO devices (hostname, ip_address, last_updated)
-                VALUES (?, ?, ?)
-            ''', (hostname, ip_address, current_time))
-            conn.commit()
-        print(f"Reported IP: {hostname} -> {ip_address} (Last Updated: {current_time})")
+        written = store_reports([(hostname, ip_address, current_time)])
+        status = "" if written else ", unchanged"
+        print(f"Reported IP: {hostname} -> {ip_address} (Last Updated: {current_time}{status})")
         return jsonify({"message": "IP updated successfully", "hostname": hostname, "ip_address": ip_address}), 200
     except sqlite3.Error as e:
         print(f"Database error: {e}")
@@ -71,6 +766,42 @@ def report_ip():
         print(f"An unexpected error occurred: {e}")
         return jsonify({"error": "Internal server error", "details": str(e)}), 500
 
+@app.route('/report_ips', methods=['POST'])
+def report_ips():
+    """
+    Endpoint for a gateway to report the IP addresses of many devices at once.
+    Expects a JSON array: [{"hostname": "mydevice", "ip_address": "192.168.1.100"}, ...]
+    Every changed IP in the batch is written in a single transaction.
+    """
+    if not request.is_json:
+        return jsonify({"error": "Request must be JSON"}), 400
+
+    data = request.get_json()
+    if not isinstance(data, list) or not data:
+        return jsonify({"error": "Expected a non-empty JSON array of reports"}), 400
+
+    current_time = datetime.datetime.now().isoformat()
+    rows = []
+    for index, report in enumerate(data):
+        hostname = report.get('hostname') if isinstance(report, dict) else None
+        ip_address = report.get('ip_address') if isinstance(report, dict) else None
+        if not hostname or not ip_address:
+            return jsonify({"error": f"Missing hostname or ip_address in report {index}"}), 400
+        if not isinstance(hostname, str) or not isinstance(ip_address, str):
+            return jsonify({"error": f"hostname and ip_address must be strings in report {index}"}), 400
+        rows.append((hostname, ip_address, current_time))
+
+    try:
+        written = store_reports(rows)
+        print(f"Reported {len(rows)} IPs in one batch, {written} changed (Last Updated: {current_time})")
+        return jsonify({"message": "IPs updated successfully", "count": len(rows), "changed": written}), 200
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": "Database error", "details": str(e)}), 500
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+        return jsonify({"error": "Internal server error", "details": str(e)}), 500
+
 @app.route('/get_ip', methods=['GET'])
 def get_ip():
     """
@@ -83,10 +814,7 @@ def get_ip():
         return jsonify({"error": "Missing hostname query parameter"}), 400
 
     try:
-        with sqlite3.connect(DATABASE) as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT ip_address, last_updated FROM devices WHERE hostname = ?', (hostname,))
-            result = cursor.fetchone()
+        result = lookup_ip(hostname)
 
         if result:
             ip_address, last_updated = result
@@ -102,27 +830,350 @@ def get_ip():
         print(f"An unexpected error occurred: {e}")
         return jsonify({"error": "Internal server error", "details": str(e)}), 500
 
+@app.route('/get_ips', methods=['GET', 'POST'])
+def get_ips():
+    """
+    Endpoint to retrieve the IP addresses of many hostnames at once.
+    Expects repeated query parameters: ?hostname=a&hostname=b
+    or a JSON payload: {"hostnames": ["a", "b"]}
+    Found machines are returned in the order they were asked for.
+    """
+    if request.method == 'POST':
+        if not request.is_json:
+            return jsonify({"error": "Request must be JSON"}), 400
+        data = request.get_json()
+        hostnames = data.get('hostnames') if isinstance(data, dict) else None
+        if not isinstance(hostnames, list):
+            return jsonify({"error": "Missing hostnames list"}), 400
+        if not all(isinstance(h, str) for h in hostnames):
+            return jsonify({"error": "Hostnames must be strings"}), 400
+    else:
+        hostnames = request.args.getlist('hostname')
+
+    hostnames = list(dict.fromkeys(h for h in hostnames if h))   # Drop blanks and repeats, keep order
+    if not hostnames:
+        return jsonify({"error": "Missing hostname query parameter"}), 400
+
+    try:
+        sync_cache_with_other_workers()
+        found = {}
+        missing = []
+        for hostname in hostnames:
+            result = cache.get(hostname)
+            if result is None:
+                missing.append(hostname)
+            else:
+                found[hostname] = result
+
+        # Look up everything the cache didn't have in as few queries as possible
+        if missing:
+            with pool.connection() as conn:
+                for start in range(0, len(missing), MAX_SQL_VARIABLES):
+                    chunk = missing[start:start + MAX_SQL_VARIABLES]
+                    query = SQL_GET_IPS.format(','.join('?' * len(chunk)))
+                    for hostname, ip_address, last_updated in conn.execute(query, chunk):
+                        found[hostname] = (ip_address, last_updated)
+                        cache.put(hostname, ip_address, last_updated, replace=False)
+
+        devices = []
+        for h in hostnames:
+            if h in found:
+                ip_address, last_updated = last_seen.freshen(h, found[h])
+                devices.append({"hostname": h, "ip_address": ip_address, "last_updated": last_updated})
+        not_found = [h for h in hostnames if h not in found]
+        print(f"Queried {len(hostnames)} IPs in one batch ({len(not_found)} not found)")
+        return jsonify({"devices": devices, "not_found": not_found}), 200
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": "Database error", "details": str(e)}), 500
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+        return jsonify({"error": "Internal server error", "details": str(e)}), 500
+
 @app.route('/list_devices', methods=['GET'])
 def list_devices():
     """
     Endpoint to list all known device hostnames.
+    Optional query parameters:
+        ?prefix=ras        only hostnames starting with "ras"
+        ?match=ras*        only hostnames matching a glob pattern
+        ?details=1         return {"hostname", "ip_address", "last_updated"} instead of names
+        ?limit=100         page size; the reply then includes "next_cursor"
+        ?cursor=raspi      the "next_cursor" from the previous page
+    Replies carry an ETag; send it back in If-None-Match to get a 304 if nothing has changed.
+    (details=1 replies don't while newer last-seen times are still waiting to be written.)
     """
+    global _devices_version
+    prefix = request.args.get('prefix', '')
+    match = request.args.get('match')
+    details = request.args.get('details', '').lower() in ('1', 'true', 'yes')
+    cursor = request.args.get('cursor', '')
+    # Last-seen times not yet written don't change the version, so details can't come from memory while there are any
+    cacheable = not (details and last_seen.pending_count)
     try:
-        with sqlite3.connect(DATABASE) as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT hostname FROM devices ORDER BY hostname')
-            results = cursor.fetchall()
+        limit = request.args.get('limit')
+        limit = max(1, min(int(limit), LIST_PAGE_LIMIT)) if limit is not None else None
+    except ValueError:
+        return jsonify({"error": "limit must be a number"}), 400
 
-        hostnames = [row[0] for row in results]
+    try:
+        # Answer repeat requests from memory: no query and no JSON encoding
+        sync_cache_with_other_workers()
+        version = _devices_version
+        if version is not None and cacheable:
+            etag = f"devices-{version}"
+            if request.if_none_match.contains(etag):
+                response = app.response_class(status=304)
+                response.set_etag(etag)
+                return response
+            body = _list_bodies.get((version, request.query_string))
+            if body is not None:
+                response = app.response_class(body, mimetype='application/json')
+                response.set_etag(etag)
+                return response
 
-        return jsonify({"devices": hostnames}), 200
+        conditions, params = '', [cursor]
+        if prefix:
+            # A range on the primary key, so the index does the filtering
+            conditions += ' AND hostname >= ? AND hostname < ?'
+            params += [prefix, prefix + '\U0010ffff']
+        if match:
+            conditions += ' AND hostname GLOB ?'
+            params.append(match)
+        query = SQL_LIST_DEVICES.format(conditions, ' LIMIT ?' if limit else '')
+        if limit:
+            params.append(limit + 1)
+
+        forgotten = _devices_forgotten
+        with pool.connection() as conn:
+            conn.execute('BEGIN')   # The version and the rows must come from the same moment
+            version = conn.execute(SQL_GET_VERSION).fetchone()[0]
+            results = conn.execute(query, params).fetchall()
+
+        reply = {}
+        if limit:
+            reply["next_cursor"] = results[limit - 1][0] if len(results) > limit else None
+            results = results[:limit]
+        if details:
+            reply["devices"] = [{"hostname": h, "ip_address": ip, "last_updated": last_seen.freshen(h, (ip, t))[1]}
+                                for h, ip, t in results]
+        else:
+            reply["devices"] = [row[0] for row in results]
+
+        body = app.json.dumps(reply)
+        if forgotten == _devices_forgotten:   # Only remember it if nothing was written meanwhile
+            if _devices_version != version:
+                _list_bodies.clear()
+            if cacheable and len(_list_bodies) < LIST_BODY_CACHE_SIZE:
+                _list_bodies[(version, request.query_string)] = body
+            _devices_version = version
+
+        response = app.response_class(body, mimetype='application/json')
+        if cacheable:
+            response.set_etag(f"devices-{version}")
+        return response
 
     except sqlite3.Error as e:
         return jsonify({"error": "Database error", "details": str(e)}), 500
 
+@app.route('/watch', methods=['GET'])
+def watch():
+    """
+    Endpoint that waits for IP changes (long-polling).
+    Without a cursor it returns every machine plus a cursor:
+        {"snapshot": true, "cursor": 12, "devices": [{"hostname", "ip_address", "last_updated"}, ...]}
+    With ?cursor=12 it waits (up to ?timeout= seconds) for anything newer:
+        {"snapshot": false, "cursor": 14, "changes": [{"seq", "hostname", "ip_address", "changed_at"}, ...]}
+    An empty "changes" list just means nothing changed before the timeout.
+    If the cursor is too old to catch up from, a fresh snapshot is returned instead.
+    """
+    cursor = request.args.get('cursor')
+    try:
+        cursor = int(cursor) if cursor is not None else None
+        timeout = min(float(request.args.get('timeout', WATCH_TIMEOUT_SECONDS)), WATCH_TIMEOUT_SECONDS)
+    except ValueError:
+        return jsonify({"error": "cursor and timeout must be numbers"}), 400
+
+    deadline = time.monotonic() + max(timeout, 0)
+    try:
+        while True:
+            generation = change_feed.generation
+            with pool.connection() as conn:
+                conn.execute('BEGIN')   # The snapshot and its cursor must come from the same moment
+                oldest, newest = conn.execute(SQL_CHANGE_RANGE).fetchone()
+                if cursor is None or cursor > (newest or 0) or (oldest is not None and cursor < oldest - 1):
+                    devices = [{"hostname": h, "ip_address": ip, "last_updated": last_seen.freshen(h, (ip, t))[1]}
+                               for h, ip, t in conn.execute(SQL_ALL_DEVICES)]
+                    return jsonify({"snapshot": True, "cursor": newest or 0, "devices": devices}), 200
+                rows = conn.execute(SQL_CHANGES_SINCE, (cursor, WATCH_BATCH_SIZE)).fetchall()
+
+            if rows:
+                changes = [{"seq": seq, "hostname": h, "ip_address": ip, "changed_at": t}
+                           for seq, h, ip, t in rows]
+                return jsonify({"snapshot": False, "cursor": rows[-1][0], "changes": changes}), 200
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return jsonify({"snapshot": False, "cursor": cursor, "changes": []}), 200
+            # Other workers can't notify this process, so only nap briefly when sharing the database
+            change_feed.wait(generation, min(remaining, WATCH_POLL_SECONDS) if SHARED_DATABASE else remaining)
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": "Database error", "details": str(e)}), 500
+
+@app.route('/history', methods=['GET'])
+def history():
+    """
+    Endpoint to page through the IP changes of one machine.
+    Expects query parameters: ?hostname=raspi&since=2026-10-13&until=2026-10-14T12:00
+    (since/until are optional ISO dates or times, and ?limit= sets the page size)
+    "previous" is the change in effect at "since", so the address at any moment
+    can be worked out. Pass "next_cursor" back as ?cursor= to get the next page.
+    """
+    hostname = request.args.get('hostname')
+    if not hostname:
+        return jsonify({"error": "Missing hostname query parameter"}), 400
+
+    try:
+        since = datetime.datetime.fromisoformat(request.args['since']).isoformat() if 'since' in request.args else ''
+        until = datetime.datetime.fromisoformat(request.args['until']).isoformat() if 'until' in request.args else '9999'
+        limit = max(1, min(int(request.args.get('limit', HISTORY_PAGE_SIZE)), HISTORY_PAGE_SIZE * 10))
+    except ValueError:
+        return jsonify({"error": "since/until must be ISO dates or times and limit a number"}), 400
+
+    # The cursor is the (changed_at, seq) of the last row already sent
+    cursor = request.args.get('cursor')
+    if cursor:
+        after_time, _, after_seq = cursor.rpartition('|')
+        if not after_seq.isdigit():
+            return jsonify({"error": "Invalid cursor"}), 400
+        after_seq = int(after_seq)
+    else:
+        after_time, after_seq = since, -1
+
+    try:
+        with pool.connection() as conn:
+            rows = conn.execute(SQL_HISTORY_PAGE, (hostname, until, after_time, after_seq, limit + 1)).fetchall()
+            previous = None
+            if not cursor:
+                before = conn.execute(SQL_HISTORY_BEFORE, (hostname, since)).fetchone()
+                if before:
+                    previous = {"ip_address": before[0], "changed_at": before[1]}
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": "Database error", "details": str(e)}), 500
+
+    more = len(rows) > limit
+    rows = rows[:limit]
+    result = {
+        "hostname": hostname,
+        "changes": [{"ip_address": ip, "changed_at": t} for _, ip, t in rows],
+        "next_cursor": f"{rows[-1][2]}|{rows[-1][0]}" if more else None,
+    }
+    if not cursor:
+        result["previous"] = previous
+    return jsonify(result), 200
+
+@app.route('/heartbeat', methods=['POST'])
+def heartbeat():
+    """
+    Endpoint for heartbeat_agent.py to send a machine's health every few minutes.
+    Expects a JSON payload (everything but hostname may be missing or null):
+        {"hostname": "raspi", "every": 300, "uptime": 86400, "load": [0.1, 0.2, 0.1],
+         "mem": [total_kb, available_kb], "disk": [total_bytes, free_bytes], "battery": [85, "Discharging"]}
+    """
+    if not request.is_json:
+        return jsonify({"error": "Request must be JSON"}), 400
+
+    data = request.get_json()
+    hostname = data.get('hostname') if isinstance(data, dict) else None
+    if not hostname or not isinstance(hostname, str):
+        return jsonify({"error": "Missing hostname"}), 400
+
+    try:
+        every = int(data.get('every') or HEARTBEAT_EVERY)
+        values = (data.get('uptime'), *(data.get('load') or [None] * 3), *(data.get('mem') or [None] * 2),
+                  *(data.get('disk') or [None] * 2), *(data.get('battery') or [None] * 2))
+        if every <= 0 or len(values) != len(HEARTBEAT_COLUMNS):
+            raise ValueError
+        # Numbers (or null) everywhere but battery_status, which is text (or null)
+        *numbers, battery_status = values
+        if (any(v is not None and (isinstance(v, bool) or not isinstance(v, (int, float))) for v in numbers)
+                or not (battery_status is None or isinstance(battery_status, str))):
+            raise ValueError
+    except (TypeError, ValueError):
+        return jsonify({"error": "Badly formed heartbeat"}), 400
+
+    now = int(time.time())
+    try:
+        with pool.connection() as conn:
+            back = conn.execute(SQL_HEARTBEAT_BACK, (hostname,)).rowcount == 1
+            conn.execute(SQL_HEARTBEAT_SEEN, (hostname, now, every))
+            conn.execute(SQL_SAVE_HEARTBEAT, (hostname, now, *values))
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": "Database error", "details": str(e)}), 500
+
+    heartbeat_watch.start()
+    if back:
+        send_notification(f"{hostname} is back", f"{hostname} is sending heartbeats again ({format_time(now)}).")
+    return jsonify({"message": "Heartbeat saved", "hostname": hostname}), 200
+
+@app.route('/heartbeats', methods=['GET'])
+def heartbeats():
+    """
+    Endpoint to see how the machines are doing.
+    With no parameters it returns every machine's newest heartbeat and whether it's missing.
+    With ?hostname=raspi it returns that machine's samples (?since= an ISO date or time,
+    the last day by default, and ?limit= up to HEARTBEAT_PAGE_SIZE).
+    """
+    hostname = request.args.get('hostname')
+    try:
+        if not hostname:
+            with pool.connection() as conn:
+                rows = conn.execute(SQL_LATEST_HEARTBEATS).fetchall()
+            machines = [{"hostname": h, "last_seen": format_time(seen), "every": every, "missing": bool(missing),
+                         **dict(zip(HEARTBEAT_COLUMNS, sample))}
+                        for h, seen, every, missing, *sample in rows]
+            return jsonify({"machines": machines}), 200
+
+        try:
+            if 'since' in request.args:
+                since = int(datetime.datetime.fromisoformat(request.args['since']).timestamp())
+            else:
+                since = int(time.time()) - 86400
+            limit = max(1, min(int(request.args.get('limit', HEARTBEAT_PAGE_SIZE)), HEARTBEAT_PAGE_SIZE))
+        except ValueError:
+            return jsonify({"error": "since must be an ISO date or time and limit a number"}), 400
+
+        with pool.connection() as conn:
+            rows = conn.execute(SQL_HEARTBEAT_HISTORY, (hostname, since, limit)).fetchall()
+        samples = [{"sampled_at": format_time(t), **dict(zip(HEARTBEAT_COLUMNS, sample))} for t, *sample in rows]
+        return jsonify({"hostname": hostname, "samples": samples}), 200
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": "Database error", "details": str(e)}), 500
+
+@app.route('/metrics', methods=['GET'])
+def metrics_page():
+    """
+    Endpoint for Prometheus (or curl) with timings and stats for this process.
+    Under gunicorn each worker keeps its own numbers, so each scrape shows one worker.
+    """
+    return app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/cache_stats', methods=['GET'])
+def cache_stats():
+    """
+    Endpoint to show how well the lookup cache is doing.
+    """
+    return jsonify(cache.stats()), 200
+
 if __name__ == '__main__':
     # Initialize the database when the application starts
     init_db()
+    # Watch for missing heartbeats from the start, not just once the first one comes in
+    heartbeat_watch.start()
     # Run the Flask app
     # host='0.0.0.0' makes it accessible from other devices on the network
     # port=5000 is the default Flask port, you can change it if needed
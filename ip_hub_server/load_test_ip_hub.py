@@ -0,0 +1,148 @@
+#--------------------------------------------------------------------
+# IP Hub Load Test
+# Jeffrey D. Shaffer and Generative-AI
+# 2026-10-18
+#
+# Notes:
+#    - Starts the IP hub under gunicorn (see gunicorn.conf.py) with
+#      1, 2, 4... worker processes, each time on a spare local port
+#      with a throwaway database
+#    - Several client processes then send a steady mix of lookups
+#      and reports over keep-alive connections for a few seconds
+#    - Prints throughput and p50/p99 latency for each worker count,
+#      which shows how well the hub scales on a multi-core machine
+#    - Usage:  python3 load_test_ip_hub.py [seconds] [client_processes]
+#
+#--------------------------------------------------------------------
+
+import http.client
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MACHINES = 50            # Hostnames registered before the test starts
+THREADS_PER_CLIENT = 4   # Connections each client process keeps open
+REPORT_EVERY = 10        # One request in this many is a report, the rest are lookups
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_hub(workers, port, workdir):
+    """Starts gunicorn in workdir (so ip_addresses.db lands there) and waits for it."""
+    hub = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', os.path.join(HERE, 'gunicorn.conf.py'),
+         '--pythonpath', HERE, '--chdir', workdir, '--workers', str(workers),
+         '--bind', f'127.0.0.1:{port}', 'ip_hub_server:app'],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/list_devices')
+            conn.getresponse().read()
+            return hub
+        except OSError:
+            time.sleep(0.2)
+    hub.terminate()
+    raise RuntimeError("The IP hub did not start in time")
+
+
+def client_thread(port, seconds, seed, latencies, errors):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    headers = {"Content-Type": "application/json"}
+    stop_at = time.perf_counter() + seconds
+    i = seed
+    while time.perf_counter() < stop_at:
+        i += 1
+        start = time.perf_counter()
+        try:
+            if i % REPORT_EVERY == 0:
+                body = json.dumps({"hostname": f"machine{i % MACHINES}",
+                                   "ip_address": f"192.168.1.{i % 250}"})
+                conn.request('POST', '/report_ip', body=body, headers=headers)
+            else:
+                conn.request('GET', f'/get_ip?hostname=machine{i % MACHINES}')
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException):
+            errors.append(0)
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def client_process(args):
+    """Runs a few client threads and returns (latencies, error_count)."""
+    port, seconds, seed = args
+    latencies, errors = [], []
+    threads = [threading.Thread(target=client_thread,
+                                args=(port, seconds, seed * 1000 + n, latencies, errors))
+               for n in range(THREADS_PER_CLIENT)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, len(errors)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))
+    return sorted_values[index]
+
+
+def run(workers, seconds, clients):
+    port = free_port()
+    with tempfile.TemporaryDirectory() as workdir:
+        hub = start_hub(workers, port, workdir)
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port)
+            reports = [{"hostname": f"machine{n}", "ip_address": f"192.168.1.{n}"} for n in range(MACHINES)]
+            conn.request('POST', '/report_ips', body=json.dumps(reports),
+                         headers={"Content-Type": "application/json"})
+            conn.getresponse().read()
+            conn.close()
+
+            start = time.perf_counter()
+            with multiprocessing.Pool(clients) as client_pool:
+                results = client_pool.map(client_process, [(port, seconds, n) for n in range(clients)])
+            elapsed = time.perf_counter() - start
+        finally:
+            hub.terminate()
+            hub.wait()
+
+    latencies = sorted(l for result in results for l in result[0])
+    errors = sum(result[1] for result in results)
+    print(f"{workers:>7}   {len(latencies) / elapsed:>9.0f}   "
+          f"{percentile(latencies, 50) * 1000:>8.2f}   {percentile(latencies, 99) * 1000:>8.2f}   {errors:>6}")
+
+
+if __name__ == '__main__':
+    SECONDS = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    CLIENTS = int(sys.argv[2]) if len(sys.argv) > 2 else max(2, multiprocessing.cpu_count())
+
+    worker_counts = [1]
+    while worker_counts[-1] * 2 <= multiprocessing.cpu_count():
+        worker_counts.append(worker_counts[-1] * 2)
+
+    print(f"{CLIENTS} client processes x {THREADS_PER_CLIENT} keep-alive connections, {SECONDS:g} s per run")
+    print(f"{'Workers':>7}   {'Req/sec':>9}   {'p50 (ms)':>8}   {'p99 (ms)':>8}   {'Errors':>6}")
+    for workers in worker_counts:
+        run(workers, SECONDS, CLIENTS)
@@ -0,0 +1,175 @@
+#--------------------------------------------------------------------------------------
+# API Cache
+# Jeffrey D. Shaffer and Generative-AI
+# 2026-10-18
+#
+# A small on-disk cache for the weather and air-quality API calls, so asking for the
+# same place again (e.g. going back to the "wx" menu) is instant and works offline.
+#
+# Notes:
+#    - Open-Meteo only updates its "current" data every 15 minutes, so an answer is
+#      kept until just after the next update (UPDATE_SECONDS), not for a fixed time
+#    - The API is always asked about the exact place, but answers are saved under
+#      latitude and longitude rounded to CACHE_STEP, so a place very near one already
+#      looked up (about 500 m for the weather) gets that place's answer. That's close,
+#      but not exact (Open-Meteo adjusts for the elevation of the exact point, for
+#      one), so make CACHE_STEP smaller if that matters
+#    - Once an answer is out of date it is re-checked with ETag / Last-Modified, so
+#      an unchanged answer doesn't have to be downloaded again
+#    - If the API can't be reached, the last answer is used (with a warning on stderr)
+#    - The cache folder is kept under MAX_CACHE_BYTES by deleting the least recently
+#      used answers
+#
+# Use  -- from api_cache import cached_get_json
+#         data = cached_get_json("https://api.open-meteo.com/v1/forecast", {"latitude": 34.97, ...})
+#
+#--------------------------------------------------------------------------------------
+
+import hashlib
+import json
+import math
+import os
+import sys
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Configuration
+CACHE_FOLDER = os.path.join(os.path.expanduser("~"), ".cache", "jds-api")
+MAX_CACHE_BYTES = 5 * 1024 * 1024   # Oldest answers are deleted past this
+TIMEOUT = 10                        # Seconds to wait for the API
+UPDATE_GRACE = 60                   # Seconds after an update before asking (gives the provider time to publish)
+
+# How often each provider updates its data (seconds)
+UPDATE_SECONDS = {
+    "api.open-meteo.com": 15 * 60,
+    "air-quality-api.open-meteo.com": 60 * 60,
+}
+# How close (degrees) two places must be to share one saved answer
+CACHE_STEP = {
+    "api.open-meteo.com": 0.01,               # About 1 km
+    "air-quality-api.open-meteo.com": 0.05,   # About 5 km (air quality changes slowly from place to place)
+}
+DEFAULT_UPDATE_SECONDS = 15 * 60
+DEFAULT_CACHE_STEP = 0.01
+
+
+def canonical_url(url, params=None):
+    """
+    Returns the URL with params merged in, sorted, and latitude/longitude rounded
+    to CACHE_STEP, so nearby places asking the same thing share one cache entry.
+    Only used as the cache key; the API is sent the original URL.
+    """
+    parts = urlsplit(url)
+    host = parts.hostname.lower() if parts.hostname else ""
+    query = parse_qsl(parts.query) + list((params or {}).items())
+
+    step = CACHE_STEP.get(host, DEFAULT_CACHE_STEP)
+    decimals = max(0, -math.floor(math.log10(step)))
+    canonical = []
+    for key, value in query:
+        if key in ("latitude", "longitude"):
+            value = f"{round(float(value) / step) * step:.{decimals}f}"
+        canonical.append((key, str(value)))
+    canonical.sort()
+
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, urlencode(canonical, safe=","), ""))
+
+
+# When to ask again: just after the provider's next update (plus a little grace,
+# since an update isn't published the moment it's due)
+def next_update(host, now):
+    interval = UPDATE_SECONDS.get(host, DEFAULT_UPDATE_SECONDS)
+    return (math.floor((now - UPDATE_GRACE) / interval) + 1) * interval + UPDATE_GRACE
+
+
+def _entry_path(url):
+    return os.path.join(CACHE_FOLDER, hashlib.sha1(url.encode()).hexdigest() + ".json")
+
+
+def _load(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save(path, entry):
+    os.makedirs(CACHE_FOLDER, exist_ok=True)
+    temp_file = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"   # One per thread (get_weather_aqi_multi uses several)
+    with open(temp_file, "w") as f:
+        json.dump(entry, f)
+    os.replace(temp_file, path)   # Atomic, so two programs at once can't corrupt it
+    _trim()
+
+
+# Delete the least recently used answers until the folder is under MAX_CACHE_BYTES
+def _trim():
+    files = []
+    for entry in os.scandir(CACHE_FOLDER):
+        if entry.name.endswith(".json"):
+            try:
+                stat = entry.stat()
+            except OSError:   # Another program just deleted it
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= MAX_CACHE_BYTES:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+
+
+def cached_get_json(url, params=None, session=None, fresh=False):
+    """
+    GETs a JSON API through the cache and returns the parsed reply.
+    Raises requests' exceptions just like requests.get() would if there is no cached answer to fall back on.
+    """
+    key = canonical_url(url, params)
+    path = _entry_path(key)
+    entry = _load(path)
+    now = time.time()
+
+    if entry and not fresh and now < entry["expires"]:
+        try:
+            os.utime(path)   # Mark as recently used
+        except OSError:   # Another program's _trim() just deleted it, but the answer we read is still good
+            pass
+        return entry["body"]
+
+    import requests   # Only needed when the cache can't answer
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+
+    try:
+        response = (session or requests).get(url, params=params, headers=headers, timeout=TIMEOUT)
+        if response.status_code == 304 and entry is None:   # Nothing saved to keep, so it's a miss after all
+            response = (session or requests).get(url, params=params, headers={"Cache-Control": "no-cache"},
+                                                 timeout=TIMEOUT)
+            if response.status_code == 304:
+                raise requests.exceptions.HTTPError("304 Not Modified, but nothing is cached", response=response)
+        if response.status_code != 304:
+            response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        if entry is None:
+            raise
+        age = int((now - entry["fetched_at"]) / 60)
+        print(f"Warning: Couldn't reach the API ({e}); using the answer from {age} minutes ago", file=sys.stderr)
+        return entry["body"]
+
+    if response.status_code != 304:   # 304 = not changed, keep the body we have
+        entry = {"url": key, "body": response.json(),
+                 "etag": response.headers.get("ETag"),
+                 "last_modified": response.headers.get("Last-Modified")}
+    entry["fetched_at"] = now
+    entry["expires"] = next_update(urlsplit(url).hostname, now)
+    _save(path, entry)
+    return entry["body"]
@@ -0,0 +1,280 @@
+#--------------------------------------------------------------------------------------
+# AQI Core
+# Jeffrey D. Shaffer and Generative-AI
+# 2026-10-18
+#
+# The AQI math shared by calculateAQI.py (Open-Meteo) and calculateAQIg.py (Google),
+# so there is only one copy of the US EPA breakpoint tables and categories.
+#
+# Notes:
+#    - Only uses modules that come with Python, so importing it is quick
+#      (NumPy is only loaded by calculate_aqi_batch(), and nothing here
+#      needs "requests")
+#    - The tables are built once when it's imported and can't be changed
+#    - Breakpoints and categories are found with a binary search (bisect)
+#    - All concentrations going in are in μg/m³. The "adapters" turn each
+#      API's reply into that:
+#         from_open_meteo(json_data)   -- Open-Meteo's "current" dict
+#         from_google(json_data)       -- Google's "pollutants" list
+#
+# Use  -- from aqi_core import calculate_aqi, from_open_meteo
+#         aqi, category, pollutant_data = calculate_aqi(**from_open_meteo(api_data))
+#
+#--------------------------------------------------------------------------------------
+
+from bisect import bisect_right
+from collections import namedtuple
+from types import MappingProxyType
+
+# --- Conversion Factors (approximate, at 25°C and 1 atm) ---
+# CO: 1 μg/m³ = 0.873 ppb (1 mg/m³ = 0.873 ppm)
+# NO2: 1 μg/m³ = 0.532 ppb
+# SO2: 1 μg/m³ = 0.375 ppb
+# Ozone: 1 μg/m³ = 0.5 ppb
+# Multiply a concentration in μg/m³ by these to get the units the breakpoints use
+UNIT_CONVERSIONS = MappingProxyType({
+    "carbon_monoxide": 0.873 / 1000,   # to ppm
+    "nitrogen_dioxide": 0.532,         # to ppb
+    "sulphur_dioxide": 0.375,          # to ppb
+    "ozone": 0.5,                      # to ppb
+})
+
+# --- US EPA AQI Breakpoints (Concentration Hi/Lo and AQI Hi/Lo) ---
+# Structure: { pollutant_name: ((C_Lo, C_Hi, I_Lo, I_Hi), ...) }
+AQI_BREAKPOINTS = MappingProxyType({
+    "pm2_5": (
+        (0.0, 12.0, 0, 50),
+        (12.1, 35.4, 51, 100),
+        (35.5, 55.4, 101, 150),
+        (55.5, 150.4, 151, 200),
+        (150.5, 250.4, 201, 300),
+        (250.5, 350.4, 301, 400),
+        (350.5, 500.4, 401, 500),
+    ),
+    "pm10": (
+        (0, 54, 0, 50),
+        (55, 154, 51, 100),
+        (155, 254, 101, 150),
+        (255, 354, 151, 200),
+        (355, 424, 201, 300),
+        (425, 504, 301, 400),
+        (505, 604, 401, 500),
+    ),
+    "carbon_monoxide": ( # in ppm
+        (0.0, 4.4, 0, 50),
+        (4.5, 9.4, 51, 100),
+        (9.5, 12.4, 101, 150),
+        (12.5, 15.4, 151, 200),
+        (15.5, 30.4, 201, 300),
+        (30.5, 40.4, 301, 400),
+        (40.5, 50.4, 401, 500),
+    ),
+    "nitrogen_dioxide": ( # in ppb (1-hour average, used for AQI only if 1-hour ozone is not available or very high)
+        (0, 53, 0, 50),
+        (54, 100, 51, 100),
+        (101, 360, 101, 150),
+        (361, 649, 151, 200),
+        (650, 1249, 201, 300),
+        (1250, 1649, 301, 400),
+        (1650, 2049, 401, 500),
+    ),
+    "sulphur_dioxide": ( # in ppb (1-hour average)
+        (0, 35, 0, 50),
+        (36, 75, 51, 100),
+        (76, 185, 101, 150),
+        (186, 304, 151, 200),
+        (305, 604, 201, 300),
+        (605, 804, 301, 400),
+        (805, 1004, 401, 500),
+    ),
+    "ozone": ( # in ppb (8-hour average for 0-100, 1-hour for higher)
+        (0, 54, 0, 50),
+        (55, 70, 51, 100),
+        (71, 85, 101, 150),
+        (86, 105, 151, 200),
+        (106, 200, 201, 300),
+    ),
+})
+
+# The order pollutants are reported in
+POLLUTANTS = ("pm2_5", "carbon_monoxide", "nitrogen_dioxide", "sulphur_dioxide", "ozone", "pm10")
+
+
+# Each pollutant's breakpoints split into columns, for bisect
+BreakpointTable = namedtuple("BreakpointTable", "C_Lo C_Hi I_Lo slope top")
+
+def _build_table(breakpoints):
+    C_Lo, C_Hi, I_Lo, I_Hi = zip(*breakpoints)
+    slopes = tuple((i_hi - i_lo) / (c_hi - c_lo) if c_hi != c_lo else 0
+                   for c_lo, c_hi, i_lo, i_hi in breakpoints)
+    return BreakpointTable(C_Lo, C_Hi, I_Lo, slopes, C_Hi[-1])
+
+_TABLES = MappingProxyType({name: _build_table(rows) for name, rows in AQI_BREAKPOINTS.items()})
+
+
+# --- Categories: the lowest value of each, and its name ---
+AQI_CATEGORIES   = ((0, "Good"), (50, "Bothers Sensitive Groups"), (100, "Unhealthy for Sensitive Groups"),
+                    (150, "Unhealthy"), (200, "Very Unhealthy"), (300, "Hazardous"))
+PM2_5_CATEGORIES = ((0, "Good"), (12, "Bothers Sensitive Groups"), (35, "Unhealthy for Sensitive Groups"),
+                    (55, "Unhealthy"), (150, "Very Unhealthy"), (250, "Hazardous"))
+PM10_CATEGORIES  = ((0, "Good"), (55, "Bothers Sensitive Groups"), (155, "Unhealthy for Sensitive Groups"),
+                    (255, "Unhealthy"), (355, "Very Unhealthy"), (425, "Hazardous"))
+OZONE_CATEGORIES = ((0, "Good"), (108, "Bothers Sensitive Groups"), (138, "Unhealthy for Sensitive Groups"),
+                    (168, "Unhealthy"), (207, "Very Unhealthy"), (393, "Hazardous"))
+
+# Makes a function that names the category a value falls in
+def _category_lookup(categories):
+    lows = tuple(low for low, _ in categories)
+    names = tuple(name for _, name in categories)
+
+    def get_category(value):
+        if not value >= 0:   # Also catches NaN
+            return "Unknown"
+        return names[bisect_right(lows, value) - 1]
+    return get_category
+
+get_aqi_category   = _category_lookup(AQI_CATEGORIES)
+get_pm2_5_category = _category_lookup(PM2_5_CATEGORIES)
+get_pm10_category  = _category_lookup(PM10_CATEGORIES)
+get_ozone_category = _category_lookup(OZONE_CATEGORIES)
+
+
+def calculate_sub_aqi(pollutant_value, pollutant_type):
+    """Returns one pollutant's AQI (0 if missing or between two breakpoints, 501 if off the scale)."""
+    if pollutant_value is None:
+        return 0 # Handle as missing data
+
+    table = _TABLES.get(pollutant_type)
+    if not table:
+        return 0 # Unknown pollutant type
+
+    if pollutant_value > table.top:
+        return 501 # Beyond the "Hazardous" scale
+
+    # The last segment starting at or below the value, if the value isn't past its end
+    segment = bisect_right(table.C_Lo, pollutant_value) - 1
+    if segment < 0 or not pollutant_value <= table.C_Hi[segment]:
+        return 0 # Below the scale, or in a gap between two segments
+
+    # Linear interpolation formula
+    return round(table.slope[segment] * (pollutant_value - table.C_Lo[segment]) + table.I_Lo[segment])
+
+
+def calculate_aqi(pm2_5=None, carbon_monoxide=None, nitrogen_dioxide=None,
+                  sulphur_dioxide=None, ozone=None, pm10=None):
+    """
+    Calculates the Air Quality Index (AQI) from pollutant concentrations in μg/m³
+    (any of them can be None if it wasn't measured).
+
+    Returns:
+        tuple: A tuple containing:
+            - int: The calculated overall AQI.
+            - str: A message indicating the AQI category.
+            - dict: A dictionary with individual pollutant concentrations.
+    """
+    pollutant_data = {
+        "pm2_5": pm2_5,
+        "carbon_monoxide": carbon_monoxide,
+        "nitrogen_dioxide": nitrogen_dioxide,
+        "sulphur_dioxide": sulphur_dioxide,
+        "ozone": ozone,
+        "pm10": pm10,
+    }
+
+    sub_aqis = []
+    for pollutant_type, ugm3 in pollutant_data.items():
+        if ugm3 is not None:
+            conversion = UNIT_CONVERSIONS.get(pollutant_type)
+            sub_aqis.append(calculate_sub_aqi(ugm3 * conversion if conversion else ugm3, pollutant_type))
+
+    # The overall AQI is the maximum of the individual sub-indices
+    final_aqi = max(sub_aqis) if sub_aqis else 0
+    return final_aqi, get_aqi_category(final_aqi), pollutant_data
+
+
+def calculate_aqi_batch(pm2_5=None, pm10=None, carbon_monoxide=None,
+                        nitrogen_dioxide=None, sulphur_dioxide=None, ozone=None):
+    """
+    Calculates the AQI for many readings at once, the same way as
+    calculate_aqi() does for one (units are μg/m³).
+
+    Args:
+        Each pollutant is a list or NumPy array of concentrations, one per
+        reading (all the same length). Missing readings can be None/NaN, and
+        a pollutant that wasn't measured at all can be left out.
+
+    Returns:
+        tuple: A tuple containing:
+            - numpy array of int: The overall AQI of each reading.
+            - numpy array of str: The AQI category of each reading.
+    """
+    import numpy as np   # Only needed for batches, so the normal lookup starts quickly
+
+    readings = {"pm2_5": pm2_5, "pm10": pm10, "carbon_monoxide": carbon_monoxide,
+                "nitrogen_dioxide": nitrogen_dioxide, "sulphur_dioxide": sulphur_dioxide, "ozone": ozone}
+
+    final_aqi = None
+    for pollutant_type, values in readings.items():
+        if values is None:
+            continue
+        values = np.asarray(values, dtype=float)   # None becomes NaN
+        if pollutant_type in UNIT_CONVERSIONS:
+            values = values * UNIT_CONVERSIONS[pollutant_type]
+
+        table = _TABLES[pollutant_type]
+        C_Lo, C_Hi = np.array(table.C_Lo, dtype=float), np.array(table.C_Hi, dtype=float)
+        I_Lo, slope = np.array(table.I_Lo, dtype=float), np.array(table.slope)
+
+        # Find the last segment starting at or below each value, then check the value isn't past its end
+        # (values between two segments, e.g. PM2.5 of 12.05, get 0 just like calculate_sub_aqi() gives)
+        segment = np.clip(np.searchsorted(C_Lo, values, side='right') - 1, 0, None)
+        in_segment = (values >= C_Lo[segment]) & (values <= C_Hi[segment])
+
+        # Same linear interpolation and rounding (half to even) as calculate_sub_aqi()
+        with np.errstate(invalid='ignore'):
+            sub_aqi = np.rint(slope[segment] * (values - C_Lo[segment]) + I_Lo[segment])
+        sub_aqi = np.where(in_segment, sub_aqi, 0)
+        sub_aqi = np.where(values > table.top, 501, sub_aqi)   # Beyond the top of the scale
+
+        # The overall AQI is the maximum of the individual sub-indices
+        final_aqi = sub_aqi if final_aqi is None else np.maximum(final_aqi, sub_aqi)
+
+    if final_aqi is None:
+        raise ValueError("calculate_aqi_batch() needs at least one pollutant")
+    final_aqi = final_aqi.astype(int)
+
+    # Same categories as get_aqi_category() (the AQI is never below 0)
+    lows = [low for low, _ in AQI_CATEGORIES]
+    names = np.array([name for _, name in AQI_CATEGORIES])
+    category = names[np.searchsorted(lows, final_aqi, side='right') - 1]
+
+    return final_aqi, category
+
+
+# --- Provider adapters: each API's reply -> keyword arguments for calculate_aqi() in μg/m³ ---
+
+def from_open_meteo(json_data):
+    """Open-Meteo's air-quality reply, with its "current" readings already in μg/m³."""
+    current = json_data.get("current", {})
+    return {pollutant: current.get(pollutant) for pollutant in POLLUTANTS}
+
+
+# Google's pollutant codes, and what to divide by to get μg/m³ (CO, NO2, SO2 and O3 come in ppb)
+GOOGLE_CODES = MappingProxyType({
+    "pm25": ("pm2_5", 1),
+    "pm10": ("pm10", 1),
+    "co": ("carbon_monoxide", 0.873),
+    "no2": ("nitrogen_dioxide", 0.532),
+    "so2": ("sulphur_dioxide", 0.375),
+    "o3": ("ozone", 0.5),
+})
+
+def from_google(json_data):
+    """Google's currentConditions reply, with its "pollutants" list."""
+    readings = dict.fromkeys(POLLUTANTS)
+    for pollutant in json_data.get("pollutants", []):
+        if pollutant.get("code") in GOOGLE_CODES:
+            name, divide_by = GOOGLE_CODES[pollutant["code"]]
+            value = pollutant.get("concentration", {}).get("value")
+            readings[name] = value / divide_by if value is not None else None
+    return readings
@@ -0,0 +1,206 @@
+#--------------------------------------------------------------------------------------
+# AQI History
+# Jeffrey D. Shaffer and Generative-AI
+# 2026-10-18
+#
+# Downloads the hourly air quality history for a place from Open-Meteo, saves it in
+# a small SQLite database, and scores every hour's AQI, so air quality can be
+# trended over months instead of just looking at the "current" reading.
+#
+# Notes:
+#    - No API key is needed
+#    - Requires the "requests" and "numpy" python modules:
+#         pip install requests numpy
+#    - History is fetched CHUNK_DAYS at a time (a few big requests, not one per day)
+#    - Running "backfill" again only fetches what's new since the last run
+#    - The AQI of every hour is worked out with calculate_aqi_batch() in aqi_core.py
+#    - The database is ~/.local/share/jds-aqi/aqi_history.db, one row per place per
+#      hour, stored in (place, time) order so a place's history reads straight off disk
+#
+# Use  -- python3 aqi_history.py backfill                          # Shizuoka, last year
+#         python3 aqi_history.py backfill Osaka 34.8046758 135.4971523
+#         python3 aqi_history.py backfill Nara 34.567 135.708 --since 2024-01-01
+#         python3 aqi_history.py report [place] [days]             # daily worst AQI
+#         python3 aqi_history.py rescore                           # re-score everything stored
+#
+#--------------------------------------------------------------------------------------
+
+import datetime
+import os
+import sqlite3
+import sys
+import time
+
+from aqi_core import calculate_aqi_batch, get_aqi_category
+
+# Configuration
+DATABASE = os.path.join(os.path.expanduser("~"), ".local", "share", "jds-aqi", "aqi_history.db")
+AIR_QUALITY_API = "https://air-quality-api.open-meteo.com/v1/air-quality"
+DEFAULT_LOCATION = ("Shizuoka", 34.9717465, 138.378599)
+FIRST_BACKFILL_DAYS = 365   # How far back the first backfill of a place goes
+CHUNK_DAYS = 92             # Days of hourly data asked for in each request
+TIMEOUT = 30                # Seconds to wait for each request
+
+POLLUTANTS = ("pm2_5", "pm10", "carbon_monoxide", "nitrogen_dioxide", "sulphur_dioxide", "ozone")
+
+SQL_INSERT = (f"INSERT OR REPLACE INTO readings (location, time, {', '.join(POLLUTANTS)}, aqi) "
+              f"VALUES (?, ?, {', '.join('?' for _ in POLLUTANTS)}, ?)")
+
+
+def open_db(path=DATABASE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    db = sqlite3.connect(path)
+    db.execute('PRAGMA journal_mode=WAL')
+    db.execute('''
+        CREATE TABLE IF NOT EXISTS locations (
+            name TEXT PRIMARY KEY,
+            latitude REAL NOT NULL,
+            longitude REAL NOT NULL
+        )
+    ''')
+    # WITHOUT ROWID keeps the rows themselves in (location, time) order, no separate index needed
+    db.execute(f'''
+        CREATE TABLE IF NOT EXISTS readings (
+            location TEXT NOT NULL,
+            time INTEGER NOT NULL,
+            {', '.join(f'{p} REAL' for p in POLLUTANTS)},
+            aqi INTEGER,
+            PRIMARY KEY (location, time)
+        ) WITHOUT ROWID
+    ''')
+    return db
+
+
+def fetch_chunk(session, latitude, longitude, start_date, end_date):
+    """Returns Open-Meteo's "hourly" columns (times are Unix times) from start_date to end_date."""
+    params = {"latitude": latitude, "longitude": longitude, "hourly": ",".join(POLLUTANTS),
+              "start_date": start_date.isoformat(), "end_date": end_date.isoformat(),
+              "timezone": "GMT", "timeformat": "unixtime"}
+    response = session.get(AIR_QUALITY_API, params=params, timeout=TIMEOUT)
+    response.raise_for_status()
+    return response.json()["hourly"]
+
+
+def store_chunk(db, location, hourly, now):
+    """Scores a chunk of hourly readings and saves them. Returns the number of hours saved."""
+    # Only hours that have happened and have at least one reading (the API pads with forecasts/nulls)
+    keep = [i for i, t in enumerate(hourly["time"])
+            if t <= now and any(hourly[p][i] is not None for p in POLLUTANTS)]
+    if not keep:
+        return 0
+    columns = {p: [hourly[p][i] for i in keep] for p in POLLUTANTS}
+
+    aqi, _ = calculate_aqi_batch(**columns)
+
+    rows = [(location, hourly["time"][i], *(columns[p][n] for p in POLLUTANTS), int(aqi[n]))
+            for n, i in enumerate(keep)]
+    db.executemany(SQL_INSERT, rows)
+    db.commit()
+    return len(rows)
+
+
+def backfill(db, name, latitude, longitude, since=None):
+    import requests   # Only needed for downloading
+
+    db.execute('INSERT OR REPLACE INTO locations (name, latitude, longitude) VALUES (?, ?, ?)',
+               (name, latitude, longitude))
+    db.commit()
+
+    # Start from the day of the newest saved hour (it may have been only part of a day),
+    # unless asked to go further back
+    newest = db.execute('SELECT MAX(time) FROM readings WHERE location = ?', (name,)).fetchone()[0]
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    if since:
+        start = since
+    elif newest:
+        start = datetime.datetime.fromtimestamp(newest, datetime.timezone.utc).date()
+    else:
+        start = today - datetime.timedelta(days=FIRST_BACKFILL_DAYS)
+
+    print(f"Fetching hourly air quality for {name} from {start} to {today}...")
+    session = requests.Session()
+    total = 0
+    while start <= today:
+        end = min(start + datetime.timedelta(days=CHUNK_DAYS - 1), today)
+        try:
+            hourly = fetch_chunk(session, latitude, longitude, start, end)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching {start} to {end}: {e}")
+            return 1
+        saved = store_chunk(db, name, hourly, time.time())
+        total += saved
+        print(f"   {start} to {end}:  {saved:>5} hours")
+        start = end + datetime.timedelta(days=1)
+
+    print(f"Saved {total} hours for {name}.")
+    return 0
+
+
+# Score every stored hour again (e.g. after the AQI tables change)
+def rescore(db):
+    import numpy as np
+
+    for (location,) in db.execute('SELECT DISTINCT location FROM readings').fetchall():
+        rows = db.execute(f'SELECT time, {", ".join(POLLUTANTS)} FROM readings WHERE location = ? ORDER BY time',
+                          (location,)).fetchall()
+        data = np.array(rows, dtype=float)   # NULLs become NaN
+        aqi, _ = calculate_aqi_batch(**{p: data[:, n + 1] for n, p in enumerate(POLLUTANTS)})
+        db.executemany('UPDATE readings SET aqi = ? WHERE location = ? AND time = ?',
+                       zip(aqi.tolist(), [location] * len(rows), (int(t) for t in data[:, 0])))
+        db.commit()
+        print(f"Re-scored {len(rows)} hours for {location}.")
+
+
+# The worst AQI of each day, plus the average PM2.5
+def report(db, name, days):
+    since = time.time() - days * 86400
+    rows = db.execute('''
+        SELECT date(time, 'unixepoch', 'localtime') AS day, MAX(aqi), AVG(pm2_5), COUNT(*)
+        FROM readings WHERE location = ? AND time >= ?
+        GROUP BY day ORDER BY day
+    ''', (name, since)).fetchall()
+    if not rows:
+        print(f"No history saved for {name}. Run:  python3 {sys.argv[0]} backfill")
+        return 1
+
+    print(f" ")
+    print(f"------------------------------------------------------------------")
+    print(f"   Daily Air Quality for {name}")
+    print(f"------------------------------------------------------------------")
+    print(f"   Day           Worst AQI   Avg PM2.5   Hours   Category")
+    for day, worst_aqi, pm2_5, hours in rows:
+        print(f"   {day}   {worst_aqi:>9}   {pm2_5 or 0:>9.1f}   {hours:>5}   {get_aqi_category(worst_aqi)}")
+    print(f"------------------------------------------------------------------")
+    print(f" ")
+    return 0
+
+
+# --- Main execution block ---
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    usage = (f"Usage: python3 {sys.argv[0]} backfill [name latitude longitude] [--since YYYY-MM-DD]\n"
+             f"       python3 {sys.argv[0]} report [name] [days]\n"
+             f"       python3 {sys.argv[0]} rescore")
+
+    try:
+        if args and args[0] == "backfill":
+            since = None
+            if "--since" in args:
+                i = args.index("--since")
+                since = datetime.date.fromisoformat(args[i + 1])
+                del args[i:i + 2]
+            name, latitude, longitude = args[1:] if len(args) == 4 else DEFAULT_LOCATION
+            if len(args) not in (1, 4):
+                raise ValueError
+            sys.exit(backfill(open_db(), name, float(latitude), float(longitude), since))
+        elif args and args[0] == "report":
+            name = args[1] if len(args) > 1 else DEFAULT_LOCATION[0]
+            days = int(args[2]) if len(args) > 2 else 30
+            sys.exit(report(open_db(), name, days))
+        elif args == ["rescore"]:
+            rescore(open_db())
+            sys.exit(0)
+    except (ValueError, IndexError):
+        pass
+    print(usage)
+    sys.exit(1)
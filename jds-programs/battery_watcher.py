@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+#--------------------------------------------------------------------------------------
+# Battery Watcher (Linux version of shutdown_after_charge.sh)
+# Jeffrey D. Shaffer and Generative-AI
+# 2026-10-18
+#
+# Watches the laptop battery while it charges. When it's full (or has reached the
+# system's charge limit), charging is put on hold, or the charge stops going up,
+# it sends an email notification and shuts the computer down.
+#
+# Notes:
+#    - Only uses modules that come with Python (no venv needed), and Linux only
+#      (shutdown_after_charge.sh still does the job on a Mac)
+#    - Reads /sys/class/power_supply directly instead of running other programs
+#    - Wakes up as soon as the kernel says the battery changed (the same "uevents"
+#      udev listens to), and otherwise checks on a timer that gets longer as charging
+#      slows down (MIN_POLL_SECONDS to MAX_POLL_SECONDS)
+#    - "Stalled" means the charge rate over the last STALL_WINDOW_SECONDS of readings
+#      is below STALL_RATE, instead of the old "same percent for 60 checks in a row"
+#    - Uses energy_now/energy_full (or charge_now/charge_full) when the battery has
+#      them, which change long before "capacity" goes up a whole percent
+#    - The email is sent with notify_by_email.py, so it needs
+#      notify_by_email_settings.txt in the folder it's run from (if the email
+#      can't be sent, the computer is still shut down)
+#    - For "sudo shutdown now" to work without a password, see shutdown_after_charge.sh
+#
+# Use  -- python3 battery_watcher.py
+#         python3 battery_watcher.py --dry-run                  # only print what it would do
+#         python3 battery_watcher.py --sysfs /tmp/fake --dry-run
+#
+# Testing without a laptop -- make a fake battery, start the watcher, then change it:
+#         mkdir -p /tmp/fake/BAT0
+#         echo 90 > /tmp/fake/BAT0/capacity; echo Charging > /tmp/fake/BAT0/status
+#         echo 95 > /tmp/fake/BAT0/charge_control_end_threshold
+#         python3 battery_watcher.py --sysfs /tmp/fake --dry-run
+#         echo 95 > /tmp/fake/BAT0/capacity       # (in another terminal)
+#
+#--------------------------------------------------------------------------------------
+
+import glob
+import os
+import select
+import socket
+import subprocess
+import sys
+import time
+from collections import deque
+
+# Configuration
+POWER_SUPPLY = "/sys/class/power_supply"
+MIN_POLL_SECONDS = 30          # Shortest time between checks (while charging quickly)
+MAX_POLL_SECONDS = 600         # Longest time between checks (charging has all but stopped)
+POLL_STEP_PERCENT = 0.5        # Check again about when the charge should have gone up this much
+STALL_WINDOW_SECONDS = 1800    # How much recent history is looked at to spot a stalled charge
+STALL_RATE = 0.5               # Charging slower than this (percent per hour) over the window = stalled
+SHUTDOWN_COMMAND = ["sudo", "shutdown", "now"]
+NETLINK_KOBJECT_UEVENT = 15    # The kernel's uevent channel (from linux/netlink.h)
+
+
+def read_value(path):
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def find_battery(power_supply=POWER_SUPPLY):
+    """Returns the folder of the first battery, or None if there isn't one."""
+    for folder in sorted(glob.glob(os.path.join(power_supply, "BAT*"))):
+        if read_value(os.path.join(folder, "capacity")) is not None:
+            return folder
+    return None
+
+
+def read_battery(folder):
+    """
+    Returns (percent, status, threshold), or None if the battery can't be read right now.
+    percent has decimals when the battery reports energy or charge.
+    """
+    percent = None
+    for now_name, full_name in (("energy_now", "energy_full"), ("charge_now", "charge_full")):
+        now, full = read_value(os.path.join(folder, now_name)), read_value(os.path.join(folder, full_name))
+        if now and full and full.isdigit() and int(full) > 0:
+            percent = min(100 * int(now) / int(full), 100.0)
+            break
+    if percent is None:
+        capacity = read_value(os.path.join(folder, "capacity"))
+        if not capacity or not capacity.isdigit():   # e.g. the battery was just removed
+            return None
+        percent = float(capacity)
+    status = read_value(os.path.join(folder, "status")) or "Unknown"
+    threshold = read_value(os.path.join(folder, "charge_control_end_threshold"))
+    return percent, status, int(threshold) if threshold and threshold.isdigit() else 100
+
+
+class ChargeHistory:
+    """The last window_seconds of (time, percent) readings."""
+
+    def __init__(self, window_seconds):
+        self.window_seconds = window_seconds
+        self.readings = deque()
+
+    def add(self, when, percent):
+        self.readings.append((when, percent))
+        # Keep one reading older than the window, so the history can cover the whole window
+        while len(self.readings) > 2 and self.readings[1][0] <= when - self.window_seconds:
+            self.readings.popleft()
+
+    def clear(self):
+        self.readings.clear()
+
+    def span(self):
+        return self.readings[-1][0] - self.readings[0][0] if len(self.readings) > 1 else 0
+
+    def rate(self):
+        """Percent per hour (a least-squares line through the readings), or None with too few readings."""
+        if self.span() <= 0:
+            return None
+        count = len(self.readings)
+        mean_time = sum(t for t, _ in self.readings) / count
+        mean_percent = sum(p for _, p in self.readings) / count
+        spread = sum((t - mean_time) ** 2 for t, _ in self.readings)
+        slope = sum((t - mean_time) * (p - mean_percent) for t, p in self.readings) / spread
+        return slope * 3600
+
+
+class BatteryWatcher:
+    """Decides, from readings of one battery, when charging is done."""
+
+    def __init__(self, folder, window_seconds=STALL_WINDOW_SECONDS):
+        self.folder = folder
+        self.history = ChargeHistory(window_seconds)
+        self.percent, self.status, self.threshold = None, None, 100
+
+    def check(self, when):
+        """Reads the battery. Returns "full", "on hold", "stalled", or None to keep waiting."""
+        reading = read_battery(self.folder)
+        if reading is None:
+            self.status = "Unreadable"
+            return None
+        self.percent, self.status, self.threshold = reading
+        if self.status == "Discharging":   # Unplugged, so start over once it's plugged back in
+            self.history.clear()
+            return None
+        self.history.add(when, self.percent)
+
+        if self.status == "Full" or self.percent >= self.threshold:
+            return "full"
+        if self.status == "Not charging":   # Plugged in, but the system has stopped charging
+            return "on hold"
+        rate = self.history.rate()
+        if self.history.span() >= self.history.window_seconds and rate < STALL_RATE:
+            return "stalled"
+        return None
+
+    def seconds_until_next_check(self):
+        """Checks often while charging quickly, less often as it slows (or while unplugged)."""
+        rate = self.history.rate()
+        if self.status == "Discharging":
+            return MAX_POLL_SECONDS
+        if rate is None or self.history.span() < MAX_POLL_SECONDS:
+            return MIN_POLL_SECONDS   # Not enough readings yet to trust the rate (capacity only moves in whole percents)
+        if rate <= 0:
+            return MAX_POLL_SECONDS
+        return max(MIN_POLL_SECONDS, min(POLL_STEP_PERCENT / rate * 3600, MAX_POLL_SECONDS))
+
+
+# --- Waiting for the kernel to say something changed ---
+def open_uevent_socket():
+    """Listens to the kernel's uevents (what udev hears). Returns None if that's not possible here."""
+    try:
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+        sock.bind((0, 1))   # Group 1 = events straight from the kernel
+        return sock
+    except (AttributeError, OSError):
+        return None
+
+
+def wait_for_change(sock, timeout):
+    """Waits up to timeout seconds for a power-supply event. Returns True if one came."""
+    if sock is None:
+        time.sleep(timeout)
+        return False
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        ready, _, _ = select.select([sock], [], [], remaining)
+        if ready and b"SUBSYSTEM=power_supply" in sock.recv(16384):
+            return True
+
+
+# --- Notify and shut down ---
+def finish(reason, watcher, name, dry_run):
+    percent = round(watcher.percent)
+    minutes = round(watcher.history.span() / 60)
+    subject, body = {
+        "full": (f"{name} Shutdown (Max Charge Reached)",
+                 f"{name} has shutdown after charging to {percent}% (the system's limit is {watcher.threshold}%)."),
+        "on hold": (f"{name} Shutdown (Charging on Hold)",
+                    f"{name} has shutdown after partially charging to {percent}%. The system has put charging on hold."),
+        "stalled": (f"{name} Shutdown (Charge Plateau)",
+                    f"{name} has shutdown after the battery stayed at about {percent}% for {minutes} minutes. "
+                    f"Charging appears complete."),
+    }[reason]
+
+    print(f"{subject}: {body}")
+    if dry_run:
+        print("(Dry run, so no email and no shutdown.)")
+        return
+    try:
+        from notify_by_email import send_email_notification
+        send_email_notification(subject, body)   # Returns once the email is sent
+    except (Exception, SystemExit) as e:   # load_settings() exits if the settings file is missing
+        print(f"Error: Couldn't send the email ({e!r}), shutting down anyway.")
+    subprocess.run(SHUTDOWN_COMMAND)
+
+
+# --- Main execution block ---
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    dry_run = "--dry-run" in args
+    power_supply = POWER_SUPPLY
+    if "--sysfs" in args:
+        try:
+            power_supply = args[args.index("--sysfs") + 1]
+        except IndexError:
+            print(f"Usage: python3 {sys.argv[0]} [--dry-run] [--sysfs folder]")
+            sys.exit(1)
+
+    print("")
+    print("Starting the Battery Watcher...")
+    folder = find_battery(power_supply)
+    if folder is None:
+        print("WARNING: This computer does not have a battery.")
+        print("Script canceled.")
+        print("")
+        sys.exit(0)
+
+    name = os.environ.get("machine_name") or socket.gethostname().split(".")[0]
+    watcher = BatteryWatcher(folder)
+    sock = open_uevent_socket()
+    print(f"Watching {folder} ({'kernel events and ' if sock else ''}adaptive polling)")
+
+    while True:
+        reason = watcher.check(time.monotonic())
+        rate = watcher.history.rate()
+        rate_text = f"{rate:+.1f}%/h" if rate is not None else "rate unknown"
+        wait = watcher.seconds_until_next_check()
+        percent_text = f"{watcher.percent:.1f}%" if watcher.percent is not None else "?%"
+        print(f"Battery: {percent_text} | {watcher.status} | {rate_text} | next check in {wait:.0f} s", flush=True)
+        if reason:
+            finish(reason, watcher, name, dry_run)
+            sys.exit(0)
+        wait_for_change(sock, wait)
@@ -0,0 +1,95 @@
+#--------------------------------------------------------------------
+# AQI Benchmark
+# Jeffrey D. Shaffer and Generative-AI
+# 2026-10-18
+#
+# Notes:
+#    - Makes up lots of random hourly readings (plus every breakpoint
+#      edge, gaps between breakpoints, values off the scale and
+#      missing values), then scores them twice:
+#         one at a time -- calculate_aqi_from_data(), once per reading
+#         batch         -- calculate_aqi_batch(), all readings at once
+#    - Checks that both give exactly the same AQI and category for
+#      every reading (exits with an error if not), and prints how long
+#      each one took
+#    - Requires the "numpy" python module:
+#         pip install numpy
+#    - Usage:  python3 benchmark_aqi.py [readings]
+#
+#--------------------------------------------------------------------
+
+import sys
+import time
+
+import numpy as np
+
+from aqi_core import AQI_BREAKPOINTS, calculate_aqi_batch
+from calculateAQI import calculate_aqi_from_data
+
+POLLUTANTS = ["pm2_5", "pm10", "carbon_monoxide", "nitrogen_dioxide", "sulphur_dioxide", "ozone"]
+
+# Multiply a breakpoint by this to get it back in μg/m³ (the units the readings come in)
+TO_UGM3 = {"pm2_5": 1, "pm10": 1, "carbon_monoxide": 1000 / 0.873,
+           "nitrogen_dioxide": 1 / 0.532, "sulphur_dioxide": 1 / 0.375, "ozone": 1 / 0.5}
+
+
+def make_readings(count, seed=1):
+    """Returns {pollutant: float array in μg/m³}, with NaN for missing readings."""
+    rng = np.random.default_rng(seed)
+    readings = {}
+    for pollutant in POLLUTANTS:
+        top = AQI_BREAKPOINTS[pollutant][-1][1] * TO_UGM3[pollutant] * 1.2   # A bit past the top of the scale
+        values = rng.exponential(top / 8, count)
+        values[::2] = np.round(values[::2], 1)   # Half rounded like real data, so breakpoints get hit exactly
+
+        # Every breakpoint, just below and just above it, and some odd values
+        edges = []
+        for C_Lo, C_Hi, _, _ in AQI_BREAKPOINTS[pollutant]:
+            for c in (C_Lo, C_Hi):
+                edges += [c, c - 0.05, c + 0.05, c * TO_UGM3[pollutant]]
+        edges += [-1.0, 0.0, top * 10]
+        values[:len(edges)] = rng.permutation(edges)
+
+        values[rng.random(count) < 0.01] = np.nan   # Some readings missing
+        readings[pollutant] = values
+    return readings
+
+
+def score_one_at_a_time(readings):
+    columns = [readings[p].tolist() for p in POLLUTANTS]
+    aqi, category = [], []
+    for row in zip(*columns):
+        current = {p: (None if v != v else v) for p, v in zip(POLLUTANTS, row)}   # NaN -> None
+        value, name, _ = calculate_aqi_from_data({"current": current})
+        aqi.append(value)
+        category.append(name)
+    return np.array(aqi), np.array(category)
+
+
+if __name__ == '__main__':
+    COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    print(f"Making {COUNT:,} readings...")
+    readings = make_readings(COUNT)
+
+    start = time.perf_counter()
+    scalar_aqi, scalar_category = score_one_at_a_time(readings)
+    scalar_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_aqi, batch_category = calculate_aqi_batch(**readings)
+    batch_seconds = time.perf_counter() - start
+
+    print(f"{'Method':<14} {'Seconds':>9}   {'Readings/sec':>13}")
+    print(f"{'One at a time':<14} {scalar_seconds:>9.3f}   {COUNT / scalar_seconds:>13,.0f}")
+    print(f"{'Batch':<14} {batch_seconds:>9.3f}   {COUNT / batch_seconds:>13,.0f}")
+    print(f"Batch is {scalar_seconds / batch_seconds:.0f}x faster")
+
+    different = np.flatnonzero((scalar_aqi != batch_aqi) | (scalar_category != batch_category))
+    if len(different):
+        print(f"\nError: {len(different):,} readings scored differently, for example:")
+        for i in different[:10]:
+            row = {p: readings[p][i] for p in POLLUTANTS}
+            print(f"   {row}  one at a time: {scalar_aqi[i]} {scalar_category[i]}  batch: {batch_aqi[i]} {batch_category[i]}")
+        sys.exit(1)
+    print(f"\nAll {COUNT:,} readings got the same AQI and category both ways.")
@@ -0,0 +1,99 @@
+#--------------------------------------------------------------------
+# Notify Benchmark
+# Jeffrey D. Shaffer and Generative-AI
+# 2026-10-18
+#
+# Notes:
+#    - Times how long a script waits when it sends a notification:
+#         notify_queue.py             -- writes the message to the spool
+#         notify_by_email.py --queue  -- the same, after argparse/smtplib
+#         import notify_by_email      -- just the old way's imports, before
+#                                        it even starts talking to Gmail
+#      next to "python3 -c pass" (Python's own start-up time)
+#    - Each one runs as a new python3 process, like a shell script would
+#      run it, RUNS times, and the median and slowest times are printed
+#    - Also prints how long each module takes to import (-X importtime)
+#    - Everything runs with HOME in a temporary folder, so the test
+#      messages never reach a running notify_daemon.py
+#    - "gmail" also times really sending with notify_by_email.py (needs
+#      notify_by_email_settings.txt here, and sends you 3 emails)
+#    - Usage:  python3 benchmark_notify.py [runs] [gmail]
+#
+#--------------------------------------------------------------------
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def time_command(command, runs, env, cwd):
+    """Runs command runs times and returns the times in milliseconds."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, env=env, cwd=cwd, check=True, stdout=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def import_time(module, env):
+    """Returns the milliseconds -X importtime says importing module took (everything it pulls in included)."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            env=env, cwd=HERE, capture_output=True, text=True, check=True)
+    for line in reversed(result.stderr.splitlines()):
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1000
+    return float("nan")
+
+
+def print_row(name, times):
+    print(f"   {name:<32} {statistics.median(times):>8.1f} {max(times):>8.1f}")
+
+
+# --- Main execution block ---
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 20
+    with_gmail = "gmail" in sys.argv[1:]
+
+    with tempfile.TemporaryDirectory() as home:
+        env = dict(os.environ, HOME=home, PYTHONPATH=HERE)
+        python = sys.executable
+        queue_script = os.path.join(HERE, "notify_queue.py")
+        email_script = os.path.join(HERE, "notify_by_email.py")
+
+        cases = [
+            ("python3 -c pass", [python, "-c", "pass"]),
+            ("notify_queue.py", [python, queue_script, "Benchmark", "Hello"]),
+            ("python3 -S notify_queue.py", [python, "-S", queue_script, "Benchmark", "Hello"]),
+            ("notify_by_email.py --queue", [python, email_script, "--queue", "Benchmark", "Hello"]),
+            ("import notify_by_email", [python, "-c", "import notify_by_email"]),
+        ]
+        for _, command in cases:   # Warm up (first run compiles the .pyc files)
+            subprocess.run(command, env=env, cwd=home, check=True, stdout=subprocess.DEVNULL)
+
+        print(f" ")
+        print(f"{runs} runs of each, as new processes (milliseconds):")
+        print(f"   {'':<32} {'median':>8} {'slowest':>8}")
+        for name, command in cases:
+            print_row(name, time_command(command, runs, env, home))
+
+        queued = len(os.listdir(os.path.join(home, ".local", "share", "jds-notify", "spool", "new")))
+        print(f"   ({queued} messages were queued)")
+
+        print(f" ")
+        print(f"Import time (milliseconds, -X importtime):")
+        for module in ("notify_queue", "notify_by_email"):
+            print(f"   {module:<32} {import_time(module, env):>8.1f}")
+
+    if with_gmail:
+        print(f" ")
+        print(f"Really sending through Gmail with notify_by_email.py (milliseconds):")
+        print_row("notify_by_email.py", time_command([python, email_script, "Benchmark", "Sent by benchmark_notify.py"],
+                                                     3, dict(os.environ), os.getcwd()))
+    print(f" ")
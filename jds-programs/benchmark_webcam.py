@@ -0,0 +1,105 @@
+#--------------------------------------------------------------------
+# Webcam-Streamer Benchmark
+# Jeffrey D. Shaffer and Generative-AI
+# 2026-10-18
+#
+# Notes:
+#    - Compares the CPU time webcam_streamer.py spends on each frame:
+#         passthrough -- the webcam's own JPEG bytes are sent as-is
+#         re-encode   -- OpenCV decodes the frame, then cv2.imencode()
+#                        turns it back into a JPEG (the old way)
+#    - Uses the webcam settings from webcam_streamer.py, so stop the
+#      streamer first (only one program can use the webcam at a time)
+#    - Usage:  python3 benchmark_webcam.py [frames]
+#
+#    - The "synthetic" mode doesn't need a webcam. It makes one test
+#      JPEG at the streamer's resolution and times copying it against
+#      decoding and re-encoding it
+#    - Usage:  python3 benchmark_webcam.py synthetic [frames]
+#
+#--------------------------------------------------------------------
+
+import sys
+import time
+
+import cv2
+import numpy as np
+
+import webcam_streamer
+
+
+def report(name, frames, cpu_seconds, wall_seconds, frame_bytes):
+    cpu_ms = cpu_seconds * 1000 / frames
+    print(f"{name:<12} {cpu_ms:>9.2f}   {frames / wall_seconds:>9.1f}   "
+          f"{1000 / cpu_ms if cpu_ms else float('inf'):>12.0f}   {frame_bytes / 1024:>9.0f}")
+
+
+def time_frames(frames, work):
+    """Runs work() for each frame and returns (CPU seconds, wall seconds, bytes of the last frame)."""
+    data = work()   # Warm up (the first frame from a webcam is often slow)
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    for _ in range(frames):
+        data = work()
+    return time.process_time() - cpu_start, time.perf_counter() - wall_start, len(data)
+
+
+def benchmark_camera(frames):
+    results = []
+    for passthrough in (True, False):
+        webcam_streamer.MJPEG_PASSTHROUGH = passthrough
+        cap = webcam_streamer.open_camera()
+        if cap is None:
+            sys.exit(1)
+        try:
+            ret, frame = cap.read()
+            if not ret:
+                print("Error: Failed to grab frame.")
+                sys.exit(1)
+            if passthrough and not webcam_streamer.is_jpeg_buffer(frame):
+                print("This webcam (or OpenCV build) can't pass MJPEG through, only timing re-encode.")
+                continue
+
+            if passthrough:
+                def work():
+                    return cap.read()[1].tobytes()
+            else:
+                def work():
+                    return cv2.imencode('.jpg', cap.read()[1])[1].tobytes()
+            results.append(("passthrough" if passthrough else "re-encode", *time_frames(frames, work)))
+        finally:
+            cap.release()
+    return results
+
+
+def benchmark_synthetic(frames):
+    # A gradient with some noise, so the JPEG is about as hard to code as a real picture
+    height, width = webcam_streamer.RESOLUTION_HEIGHT, webcam_streamer.RESOLUTION_WIDTH
+    rows, cols = np.mgrid[0:height, 0:width]
+    image = np.dstack([(rows * 255 // height), (cols * 255 // width), ((rows + cols) % 256)]).astype(np.uint8)
+    image = cv2.add(image, np.random.default_rng(1).integers(0, 32, image.shape, dtype=np.uint8))
+    jpeg = cv2.imencode('.jpg', image)[1]
+
+    def passthrough():
+        return jpeg.tobytes()
+
+    def reencode():
+        return cv2.imencode('.jpg', cv2.imdecode(jpeg, cv2.IMREAD_COLOR))[1].tobytes()
+
+    return [("passthrough", *time_frames(frames, passthrough)),
+            ("re-encode", *time_frames(frames, reencode))]
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    synthetic = bool(args) and args[0] == 'synthetic'
+    if synthetic:
+        args = args[1:]
+    FRAMES = int(args[0]) if args else 150
+
+    results = benchmark_synthetic(FRAMES) if synthetic else benchmark_camera(FRAMES)
+
+    print(f"\n{FRAMES} frames at {webcam_streamer.RESOLUTION_WIDTH}x{webcam_streamer.RESOLUTION_HEIGHT}"
+          f"{' (synthetic)' if synthetic else ''}")
+    print(f"{'Mode':<12} {'CPU ms/fr':>9}   {'Frames/s':>9}   {'Max fps/core':>12}   {'KB/frame':>9}")
+    for name, cpu_seconds, wall_seconds, frame_bytes in results:
+        report(name, FRAMES, cpu_seconds, wall_seconds, frame_bytes)
@@ -8,10 +8,28 @@
 #
 # Note -- No private API key is needed
 #
+# 2026-10-18
+#    - The AQI math (breakpoint tables and categories) moved to
+#      aqi_core.py, shared with calculateAQIg.py, and is set up once
+#      instead of on every call. This file just fetches Open-Meteo's
+#      data and prints it
+#    - "requests" is only imported when run as a program, so other
+#      scripts can import calculate_aqi_from_data() quickly
+#    - Added calculate_aqi_batch(), which scores whole arrays of readings
+#      at once with NumPy (months of hourly data for many places). It
+#      gives exactly the same answers as calculate_aqi_from_data()
+#    - To check that and time both:  python3 benchmark_aqi.py
+#    - Answers are cached (see api_cache.py) until Open-Meteo's next update
+#
 #--------------------------------------------------------------------------------------
 
 import json
-import requests # Import the requests library
+
+# The shared AQI math (imported here too, so older scripts using these names still work)
+from aqi_core import (AQI_BREAKPOINTS, calculate_aqi, calculate_aqi_batch, calculate_sub_aqi,
+                      from_open_meteo, get_aqi_category, get_ozone_category, get_pm10_category,
+                      get_pm2_5_category)
+
 
 def calculate_aqi_from_data(json_data):
     """
@@ -28,195 +46,18 @@ def calculate_aqi_from_data(json_data):
             - str: A message indicating the AQI category.
             - dict: A dictionary with individual pollutant concentrations.
     """
+    return calculate_aqi(**from_open_meteo(json_data))
 
-    current = json_data.get("current", {})
-
-    pm2_5_ugm3 = current.get("pm2_5")
-    carbon_monoxide_ugm3 = current.get("carbon_monoxide")
-    nitrogen_dioxide_ugm3 = current.get("nitrogen_dioxide")
-    sulphur_dioxide_ugm3 = current.get("sulphur_dioxide")
-    ozone_ugm3 = current.get("ozone")
-    pm10_ugm3 = current.get("pm10")
-
-    # Store all pollutant values in a dictionary to return them
-    pollutant_data = {
-        "pm2_5": pm2_5_ugm3,
-        "carbon_monoxide": carbon_monoxide_ugm3,
-        "nitrogen_dioxide": nitrogen_dioxide_ugm3,
-        "sulphur_dioxide": sulphur_dioxide_ugm3,
-        "ozone": ozone_ugm3,
-        "pm10": pm10_ugm3,
-    }
-
-    # --- Conversion Factors (approximate, at 25°C and 1 atm) ---
-    # CO: 1 μg/m³ = 0.873 ppb (1 mg/m³ = 0.873 ppm)
-    # NO2: 1 μg/m³ = 0.532 ppb
-    # SO2: 1 μg/m³ = 0.375 ppb
-    # Ozone: 1 μg/m³ = 0.5 ppb
-
-    # --- US EPA AQI Breakpoints (Concentration Hi/Lo and AQI Hi/Lo) ---
-    # Structure: { pollutant_name: [(C_Lo, C_Hi, I_Lo, I_Hi), ...] }
-    aqi_breakpoints = {
-        "pm2_5": [
-            (0.0, 12.0, 0, 50),
-            (12.1, 35.4, 51, 100),
-            (35.5, 55.4, 101, 150),
-            (55.5, 150.4, 151, 200),
-            (150.5, 250.4, 201, 300),
-            (250.5, 350.4, 301, 400),
-            (350.5, 500.4, 401, 500),
-        ],
-        "pm10": [
-            (0, 54, 0, 50),
-            (55, 154, 51, 100),
-            (155, 254, 101, 150),
-            (255, 354, 151, 200),
-            (355, 424, 201, 300),
-            (425, 504, 301, 400),
-            (505, 604, 401, 500),
-        ],
-        "carbon_monoxide": [ # in ppm
-            (0.0, 4.4, 0, 50),
-            (4.5, 9.4, 51, 100),
-            (9.5, 12.4, 101, 150),
-            (12.5, 15.4, 151, 200),
-            (15.5, 30.4, 201, 300),
-            (30.5, 40.4, 301, 400),
-            (40.5, 50.4, 401, 500),
-        ],
-        "nitrogen_dioxide": [ # in ppb (1-hour average, used for AQI only if 1-hour ozone is not available or very high)
-            (0, 53, 0, 50),
-            (54, 100, 51, 100),
-            (101, 360, 101, 150),
-            (361, 649, 151, 200),
-            (650, 1249, 201, 300),
-            (1250, 1649, 301, 400),
-            (1650, 2049, 401, 500),
-        ],
-        "sulphur_dioxide": [ # in ppb (1-hour average)
-            (0, 35, 0, 50),
-            (36, 75, 51, 100),
-            (76, 185, 101, 150),
-            (186, 304, 151, 200),
-            (305, 604, 201, 300),
-            (605, 804, 301, 400),
-            (805, 1004, 401, 500),
-        ],
-        "ozone": [ # in ppb (8-hour average for 0-100, 1-hour for higher)
-            (0, 54, 0, 50),
-            (55, 70, 51, 100),
-            (71, 85, 101, 150),
-            (86, 105, 151, 200),
-            (106, 200, 201, 300),
-        ],
-    }
-
-    def get_aqi_category(aqi_value):
-        if   aqi_value >= 300: return "Hazardous"
-        elif aqi_value >= 200: return "Very Unhealthy"
-        elif aqi_value >= 150: return "Unhealthy"
-        elif aqi_value >= 100: return "Unhealthy for Sensitive Groups"
-        elif aqi_value >=  50: return "Bothers Sensitive Groups"
-        elif aqi_value >=   0: return "Good"
-        else: return "Unknown"
-
-    def calculate_sub_aqi(pollutant_value, pollutant_type):
-        if pollutant_value is None:
-            return 0 # Handle as missing data
-
-        breakpoints = aqi_breakpoints.get(pollutant_type)
-        if not breakpoints:
-            return 0 # Unknown pollutant type
-
-        # Find the correct breakpoint range
-        for C_Lo, C_Hi, I_Lo, I_Hi in breakpoints:
-            # Check if value is within the segment
-            if C_Lo <= pollutant_value <= C_Hi:
-                # Linear interpolation formula
-                if C_Hi == C_Lo: # Avoid division by zero if range is single point
-                    return I_Lo
-                aqi_sub = ((I_Hi - I_Lo) / (C_Hi - C_Lo)) * (pollutant_value - C_Lo) + I_Lo
-                return round(aqi_sub)
-            # If the value is above the highest breakpoint, cap it at 500 or extrapolate beyond
-            # For simplicity, if it's beyond the last defined highest point, we'll mark as 501 (Hazardous)
-            elif pollutant_value > breakpoints[-1][1] and (C_Hi == breakpoints[-1][1]):
-                # This simple cap is a common practice for values far beyond the "Hazardous" scale.
-                return 501 # Indicate value is in "Beyond AQI" or "Hazardous"
-        return 0 # Should not happen if breakpoints cover all ranges, but as a safeguard
-
-    # --- Convert and Calculate Sub-AQIs ---
-    sub_aqis = []
-
-    if pm2_5_ugm3 is not None:
-        sub_aqis.append(calculate_sub_aqi(pm2_5_ugm3, "pm2_5"))
 
-    if pm10_ugm3 is not None:
-        sub_aqis.append(calculate_sub_aqi(pm10_ugm3, "pm10"))
-
-    if carbon_monoxide_ugm3 is not None:
-        # Convert μg/m³ to ppm for CO
-        co_ppm = carbon_monoxide_ugm3 * (0.873 / 1000)
-        sub_aqis.append(calculate_sub_aqi(co_ppm, "carbon_monoxide"))
-
-    if nitrogen_dioxide_ugm3 is not None:
-        # Convert μg/m³ to ppb for NO2
-        no2_ppb = nitrogen_dioxide_ugm3 * 0.532
-        sub_aqis.append(calculate_sub_aqi(no2_ppb, "nitrogen_dioxide"))
-
-    if sulphur_dioxide_ugm3 is not None:
-        # Convert μg/m³ to ppb for SO2
-        so2_ppb = sulphur_dioxide_ugm3 * 0.375
-        sub_aqis.append(calculate_sub_aqi(so2_ppb, "sulphur_dioxide"))
-
-    if ozone_ugm3 is not None:
-        # Convert μg/m³ to ppb for Ozone
-        o3_ppb = ozone_ugm3 * 0.5
-        sub_aqis.append(calculate_sub_aqi(o3_ppb, "ozone"))
-
-    # The overall AQI is the maximum of the individual sub-indices
-    final_aqi = max(sub_aqis) if sub_aqis else 0
-    category = get_aqi_category(final_aqi)
-
-    return final_aqi, category, pollutant_data
-
-
-def get_pm2_5_category(pm2_5_value):
-    if   pm2_5_value >= 250: return "Hazardous"
-    elif pm2_5_value >= 150: return "Very Unhealthy"
-    elif pm2_5_value >=  55: return "Unhealthy"
-    elif pm2_5_value >=  35: return "Unhealthy for Sensitive Groups"
-    elif pm2_5_value >=  12: return "Bothers Sensitive Groups"
-    elif pm2_5_value >=   0: return "Good"
-    else: return "Unknown"
-
-
-def get_pm10_category(pm10_value):
-    if   pm10_value >= 425: return "Hazardous"
-    elif pm10_value >= 355: return "Very Unhealthy"
-    elif pm10_value >= 255: return "Unhealthy"
-    elif pm10_value >= 155: return "Unhealthy for Sensitive Groups"
-    elif pm10_value >=  55: return "Bothers Sensitive Groups"
-    elif pm10_value >=   0: return "Good"
-    else: return "Unknown"
-
-    
-def get_ozone_category(ozone_value):
-    if   ozone_value >= 393: return "Hazardous"
-    elif ozone_value >= 207: return "Very Unhealthy"
-    elif ozone_value >= 168: return "Unhealthy"
-    elif ozone_value >= 138: return "Unhealthy for Sensitive Groups"
-    elif ozone_value >= 108: return "Bothers Sensitive Groups"
-    elif ozone_value >=   0: return "Good"
-    else: return "Unknown"
-    
 # --- Main execution block to fetch data and calculate AQI ---
 if __name__ == "__main__":
+    import requests # Import the requests library (only needed to fetch the data)
+    from api_cache import cached_get_json
+
     api_url = "https://air-quality-api.open-meteo.com/v1/air-quality?latitude=34.975&longitude=138.4088016&current=pm2_5,carbon_monoxide,nitrogen_dioxide,sulphur_dioxide,ozone,pm10"
 
     try:
-        response = requests.get(api_url)
-        response.raise_for_status() # Raise an exception for HTTP errors (4xx or 5xx)
-        api_data = response.json()
+        api_data = cached_get_json(api_url) # Raises an exception for HTTP errors (4xx or 5xx)
 
         aqi_value, aqi_category, pollutant_data = calculate_aqi_from_data(api_data)
         pm2_5_category = get_pm2_5_category(pollutant_data.get('pm2_5'))
@@ -12,6 +12,11 @@
 #
 # Note: This requires a Google App Password to be setup
 #
+# 2026-10-18
+#    - heartbeat_agent.py and the IP-hub now do this for every machine
+#      (one summary email a day, plus an email if a machine goes quiet).
+#      This is kept for machines that can't reach the hub.
+#
 #--------------------------------------------------------------------------------------------------
 
 import smtplib
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+#--------------------------------------------------------------------------------------
+# Get IP (Python version of get_ip.sh)
+# Jeffrey D. Shaffer and Generative-AI
+# 2026-10-18
+#
+# Asks the IP-hub for the IP address of a machine by its nickname, just like
+# get_ip.sh, but remembers the answers in a small cache file so repeat lookups
+# don't need the network at all.
+#
+# Notes:
+#    - Only uses modules that come with Python (no venv needed)
+#    - Answers are cached in ~/.cache/iphub/ip_cache.json for CACHE_TTL seconds
+#    - If the hub can't be reached (or answers with an error), the last known IP is used instead
+#      (with a warning on stderr, so "| tail -n 1" still gets the IP)
+#    - Several machines are looked up with one request, over one connection
+#    - Be sure to update and check the "Configuration" below
+#
+# Use  -- python3 get_ip.py raspi              # prints just the IP
+#         python3 get_ip.py raspi asus dm200   # prints "hostname ip" lines
+#         python3 get_ip.py list               # lists the machines the hub knows
+#         python3 get_ip.py --fresh raspi      # skip the cache
+#
+# It can also be imported by other scripts:
+#         from get_ip import IPHubClient
+#         hub = IPHubClient()
+#         ip = hub.get_ip("raspi")
+#
+#--------------------------------------------------------------------------------------
+
+import json
+import os
+import sys
+import time
+
+# Configuration
+RPI_HUB_IP = "192.168.1.1"    # Be sure to set this to the local machine's IP
+RPI_HUB_PORT = 5000
+HUB_TIMEOUT = 5               # Seconds to wait for the hub
+CACHE_TTL = 300               # Seconds a cached IP is trusted without asking the hub
+CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "iphub", "ip_cache.json")
+
+
+class HubUnreachable(Exception):
+    """The IP-hub could not be contacted, or answered with an error instead of an IP."""
+
+
+class IPHubClient:
+    """Looks up machine IPs from the IP-hub, with an on-disk cache and one kept-alive connection."""
+
+    def __init__(self, host=RPI_HUB_IP, port=RPI_HUB_PORT, cache_file=CACHE_FILE, ttl=CACHE_TTL):
+        self.host = host
+        self.port = port
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self._conn = None
+        self._cache = None
+        self._cache_dirty = False
+
+    # --- Cache file ---
+    def _load_cache(self):
+        if self._cache is None:
+            try:
+                with open(self.cache_file, 'r') as f:
+                    self._cache = json.load(f)
+            except (OSError, ValueError):
+                self._cache = {}
+        return self._cache
+
+    def save(self):
+        """Writes the cache file (atomically, so two lookups at once can't corrupt it)."""
+        if not self._cache_dirty:
+            return
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        temp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+        with open(temp_file, 'w') as f:
+            json.dump(self._cache, f)
+        os.replace(temp_file, self.cache_file)
+        self._cache_dirty = False
+
+    def _remember(self, device):
+        self._load_cache()[device["hostname"]] = {
+            "ip_address": device["ip_address"],
+            "last_updated": device.get("last_updated"),
+            "fetched_at": time.time(),
+        }
+        self._cache_dirty = True
+
+    # --- Talking to the hub ---
+    def _request(self, path):
+        """GETs a path from the hub over a kept-alive connection and returns (status, parsed JSON)."""
+        import http.client   # Only needed when the cache can't answer
+        for attempt in range(2):
+            if self._conn is None:
+                self._conn = http.client.HTTPConnection(self.host, self.port, timeout=HUB_TIMEOUT)
+            try:
+                self._conn.request('GET', path)
+                response = self._conn.getresponse()
+                body = response.read()
+                break
+            except (OSError, http.client.HTTPException) as e:
+                self._conn.close()
+                self._conn = None
+                # A kept-alive connection may have been closed by the hub, so retry once
+                if attempt == 1 or not isinstance(e, (http.client.RemoteDisconnected, BrokenPipeError,
+                                                      ConnectionResetError)):
+                    raise HubUnreachable(str(e)) from e
+        try:
+            return response.status, json.loads(body)
+        except ValueError:
+            return response.status, {"error": f"Could not parse response: {body[:200]!r}"}
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # --- Lookups ---
+    def get_ips(self, hostnames, fresh=False):
+        """
+        Returns ({hostname: ip_address}, {hostname: error message}).
+        Cached answers younger than the TTL are used without asking the hub.
+        If the hub is unreachable or answers with an error, stale cached answers are used instead.
+        """
+        cache = self._load_cache()
+        now = time.time()
+        found, errors = {}, {}
+
+        wanted = []
+        for hostname in hostnames:
+            entry = cache.get(hostname)
+            if not fresh and entry and now - entry["fetched_at"] < self.ttl:
+                found[hostname] = entry["ip_address"]
+            else:
+                wanted.append(hostname)
+
+        if wanted:
+            from urllib.parse import quote
+            try:
+                if len(wanted) == 1:
+                    status, reply = self._request(f"/get_ip?hostname={quote(wanted[0])}")
+                    if status == 200:
+                        self._remember(reply)
+                        found[wanted[0]] = reply["ip_address"]
+                    elif status == 404:
+                        errors[wanted[0]] = reply.get("error", f"HTTP {status}")
+                    else:   # e.g. a database error on the hub, so the cached IP is still the best answer
+                        raise HubUnreachable(reply.get("error", f"HTTP {status}"))
+                else:
+                    query = "&".join(f"hostname={quote(h)}" for h in wanted)
+                    status, reply = self._request(f"/get_ips?{query}")
+                    if status != 200:
+                        raise HubUnreachable(reply.get("error", f"HTTP {status}"))
+                    for device in reply["devices"]:
+                        self._remember(device)
+                        found[device["hostname"]] = device["ip_address"]
+                    for hostname in reply["not_found"]:
+                        errors[hostname] = f"Hostname '{hostname}' not found"
+            except HubUnreachable as e:
+                for hostname in wanted:
+                    if hostname in cache:
+                        age = int(now - cache[hostname]["fetched_at"])
+                        print(f"Warning: No answer from the IP hub ({e}); using {hostname}'s last known IP "
+                              f"from {age} seconds ago", file=sys.stderr)
+                        found[hostname] = cache[hostname]["ip_address"]
+                    else:
+                        errors[hostname] = f"No answer from the IP hub: {e}"
+
+        self.save()
+        return found, errors
+
+    def get_ip(self, hostname, fresh=False):
+        """Returns the IP address for a hostname, or None if it couldn't be found."""
+        found, _ = self.get_ips([hostname], fresh)
+        return found.get(hostname)
+
+    def list_devices(self):
+        status, reply = self._request("/list_devices")
+        if status != 200:
+            raise HubUnreachable(reply.get("error", f"HTTP {status}"))
+        return reply["devices"]
+
+
+# --- Main execution block, a drop-in for get_ip.sh ---
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    fresh = "--fresh" in args
+    hostnames = [a for a in args if a != "--fresh"]
+
+    if not hostnames:
+        print("Usage:  getIP  [--fresh]  <target_hostname> [more_hostnames...]")
+        sys.exit(1)
+
+    hub = IPHubClient()
+
+    # Special input case: list all known hostnames
+    if hostnames == ["list"]:
+        try:
+            devices = hub.list_devices()
+        except HubUnreachable as e:
+            print(f"Error: Failed to connect to the IP hub: {e}")
+            sys.exit(1)
+        print("Machines currently added to IPhub:")
+        for hostname in devices:
+            print(f"   {hostname}")
+        print("")
+        sys.exit(0)
+
+    found, errors = hub.get_ips(hostnames, fresh)
+    hub.close()
+
+    if len(hostnames) == 1:
+        if hostnames[0] in found:
+            print(found[hostnames[0]])   # Output just the IP for easy scripting
+            sys.exit(0)
+        print(f"Error: {errors.get(hostnames[0])}")
+        sys.exit(1)
+
+    for hostname in hostnames:
+        if hostname in found:
+            print(f"{hostname} {found[hostname]}")
+        else:
+            print(f"Error: {errors.get(hostname)}")
+    sys.exit(1 if errors else 0)
@@ -2,7 +2,7 @@
 # -----------------------------------------------------------------
 # Universal get_ip.sh
 # Jeffrey D. Shaffer
-# Updated -- 2025-12-24
+# Updated -- 2026-10-18
 #
 # A little program that asked a local machine (running as an IP-hub)
 # to send back the IP address of the machine name queried. 
@@ -15,6 +15,9 @@
 #    - Requires ifconfig to be installed
 #      (might need to run:  sudo apt install net-tools
 #    - Be sure to update and check the "Configuration" below
+#    - Several machines can be looked up in one call:
+#         getIP raspi asus dm200
+#      which prints one "hostname ip" line per machine found
 #
 # -----------------------------------------------------------------
 
@@ -25,7 +28,7 @@ RPI_HUB_PORT="5000"
 # Check if a hostname argument is provided
 if [ -z "$1" ]; then
 #    echo "Usage: $0 <target_hostname>"     # Older version
-    echo "Usage:  getIP  <target_hostname>"
+    echo "Usage:  getIP  <target_hostname> [more_hostnames...]"
     exit 1
 fi
 
@@ -40,6 +43,36 @@ if [ "$TARGET_HOSTNAME" = "list" ]; then
     exit 0
 fi
 
+# Several hostnames: resolve them all with one request to /get_ips
+if [ $# -gt 1 ]; then
+    QUERY_ARGS=()
+    for NAME in "$@"; do
+        QUERY_ARGS+=(--data-urlencode "hostname=${NAME}")
+    done
+
+    response=$(curl -s -G "http://${RPI_HUB_IP}:${RPI_HUB_PORT}/get_ips" "${QUERY_ARGS[@]}")
+    CURL_STATUS=$?
+
+    if [ $CURL_STATUS -ne 0 ]; then
+        echo "Error: Failed to connect to the IP hub. Curl exit code: ${CURL_STATUS}"
+        exit 1
+    fi
+
+    # One jq pass prints "hostname ip" for each machine found and flags the rest
+    RESULTS=$(echo "${response}" | jq -r '
+        if .error then "Error from IP hub: \(.error)"
+        else (.devices[] | "\(.hostname) \(.ip_address)"),
+             (.not_found[] | "Error: Hostname \(.) not found")
+        end')
+    echo "${RESULTS}"
+
+    # Exit with an error if anything could not be resolved
+    if echo "${RESULTS}" | grep -q "^Error"; then
+        exit 1
+    fi
+    exit 0
+fi
+
 #echo "Querying IP for ${TARGET_HOSTNAME} from http://${RPI_HUB_IP}:${RPI_HUB_PORT}/get_ip"
 response=$(curl -s "http://${RPI_HUB_IP}:${RPI_HUB_PORT}/get_ip?hostname=${TARGET_HOSTNAME}")
 CURL_STATUS=$?
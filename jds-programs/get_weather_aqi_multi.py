@@ -0,0 +1,231 @@
+#################################################################################################
+# Get Weather and AQI for Many Places -- Version 1.0
+# Jeffrey D. Shaffer and Generative-AI
+# 2026-10-18
+#
+#################################################################################################
+# Fetches the current weather and air quality for several places at once and shows them
+# all in one table, instead of running get_weather_terminal.py and calculateAQI.py once
+# per place.
+#
+# Notes:
+#    - No API key is necessary (both come from Open-Meteo)
+#    - All the requests go out at the same time over one shared connection pool,
+#      so five places take about as long as one
+#    - Requires the "requests" python module (same "getWX" venv as the others)
+#    - Answers are cached (see api_cache.py), so only places not looked up since
+#      Open-Meteo's last update are actually fetched
+#
+# Use  -- python3 get_weather_aqi_multi.py                       # Shizuoka, Osaka and Nara
+#         python3 get_weather_aqi_multi.py 34.97,138.38 35.68,139.77
+#         python3 get_weather_aqi_multi.py --file my_places.txt  # lines of "Name  latitude  longitude"
+#         python3 get_weather_aqi_multi.py --mock-test [places]  # time it against a local fake server
+#
+#################################################################################################
+
+import http.server
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from aqi_core import calculate_aqi, from_open_meteo
+from api_cache import cached_get_json
+from get_weather_terminal import convert_wind_to_compass
+
+
+# CONFIGURATION
+DEFAULT_LOCATIONS = [
+    ("Shizuoka", 34.9717465, 138.378599),
+    ("Osaka",    34.8046758, 135.4971523),
+    ("Nara",     34.5670411, 135.7084905),
+]
+WEATHER_API = "https://api.open-meteo.com/v1/forecast"
+AIR_QUALITY_API = "https://air-quality-api.open-meteo.com/v1/air-quality"
+WEATHER_FIELDS = "temperature_2m,relative_humidity_2m,apparent_temperature,precipitation,wind_speed_10m,wind_direction_10m"
+AIR_QUALITY_FIELDS = "pm2_5,carbon_monoxide,nitrogen_dioxide,sulphur_dioxide,ozone,pm10"
+MAX_CONNECTIONS = 8     # Requests in flight at once
+TIMEOUT = 10            # Seconds to wait for each request
+USE_CACHE = True        # Use answers saved by api_cache.py while they're up to date
+
+
+# One session for everything, so connections (and their TLS handshakes) are reused
+def make_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=MAX_CONNECTIONS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_json(session, url, params):
+    if USE_CACHE:
+        return cached_get_json(url, params, session=session)
+    response = session.get(url, params=params, timeout=TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+
+def fetch_weather(session, latitude, longitude):
+    params = {"latitude": latitude, "longitude": longitude, "current": WEATHER_FIELDS,
+              "timezone": "Asia/Tokyo", "models": "jma_seamless"}
+    return get_json(session, WEATHER_API, params)["current"]
+
+
+def fetch_air_quality(session, latitude, longitude):
+    params = {"latitude": latitude, "longitude": longitude, "current": AIR_QUALITY_FIELDS}
+    return get_json(session, AIR_QUALITY_API, params)
+
+
+def fetch_all(locations, session=None):
+    """
+    Fetches the weather and air quality for every (name, latitude, longitude) at the same time.
+    Returns a list of (name, weather dict or error message, air quality JSON or error message).
+    """
+    session = session or make_session()
+    with ThreadPoolExecutor(max_workers=MAX_CONNECTIONS) as pool:
+        jobs = [(pool.submit(fetch_weather, session, lat, lon), pool.submit(fetch_air_quality, session, lat, lon))
+                for _, lat, lon in locations]
+
+        results = []
+        for (name, _, _), (weather_job, air_job) in zip(locations, jobs):
+            answers = []
+            for job in (weather_job, air_job):
+                try:
+                    answers.append(job.result())
+                except (requests.exceptions.RequestException, KeyError, ValueError) as e:
+                    answers.append(f"Error: {e}")
+            results.append((name, *answers))
+    return results
+
+
+# One column of the table, or "-" where Open-Meteo didn't have a value (null)
+def cell(value, width, spec=""):
+    return f"{value:>{width}{spec}}" if value is not None else f"{'-':>{width}}"
+
+
+# Print everything as one table
+def print_table(results):
+    line = "-" * 104
+    print(" ")
+    print(line)
+    print(f"{'Place':<14}{'Temp °C':>8}{'Feels':>7}{'Humid %':>9}{'Wind mps':>10}{'Dir':>5}{'Rain mm':>9}"
+          f"{'PM2.5':>7}{'PM10':>6}{'AQI':>5}   Air Quality")
+    print(line)
+    for name, weather, air in results:
+        if isinstance(weather, str):
+            row = f"{name:<14}{weather[:48]:<48}"
+        else:
+            wind = weather.get('wind_speed_10m')
+            compass = convert_wind_to_compass(weather.get('wind_direction_10m'))
+            row = (f"{name:<14}{cell(weather.get('temperature_2m'), 8)}{cell(weather.get('apparent_temperature'), 7)}"
+                   f"{cell(weather.get('relative_humidity_2m'), 9)}"
+                   f"{cell(wind * (1000 / 3600) if wind is not None else None, 10, '.1f')}"
+                   f"{compass if compass != 'Unknown' else '-':>5}{cell(weather.get('precipitation'), 9)}")
+        if isinstance(air, str):
+            row += f"   {air[:35]}"
+        else:
+            aqi_value, aqi_category, pollutant_data = calculate_aqi(**from_open_meteo(air))
+            if all(value is None for value in pollutant_data.values()):
+                aqi_value, aqi_category = None, "No data"
+            row += (f"{cell(pollutant_data['pm2_5'], 7, '.0f')}{cell(pollutant_data['pm10'], 6, '.0f')}"
+                    f"{cell(aqi_value, 5)}   {aqi_category}")
+        print(row)
+    print(line)
+    print(" ")
+
+
+# Read places from a file, one "Name  latitude  longitude" per line (# starts a comment)
+def load_locations(path):
+    locations = []
+    with open(path, "r") as f:
+        for line in f:
+            parts = line.split("#")[0].split()
+            if parts:
+                locations.append((" ".join(parts[:-2]), float(parts[-2]), float(parts[-1])))
+    return locations
+
+
+# --- Test mode: time fetching from a local fake Open-Meteo, one at a time vs all at once ---
+MOCK_LATENCY = 0.25   # Seconds the fake server waits before answering (like a real round trip)
+
+class MockOpenMeteo(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # Keep-alive, like the real thing
+
+    def do_GET(self):
+        time.sleep(MOCK_LATENCY)
+        if self.path.startswith("/v1/forecast"):
+            reply = {"current": {"temperature_2m": 21.3, "relative_humidity_2m": 60, "apparent_temperature": 21.0,
+                                 "precipitation": 0.0, "wind_speed_10m": 11.2, "wind_direction_10m": 200}}
+        else:
+            reply = {"current": {"pm2_5": 8.1, "carbon_monoxide": 210.0, "nitrogen_dioxide": 9.5,
+                                 "sulphur_dioxide": 1.2, "ozone": 80.0, "pm10": 14.0}}
+        body = json.dumps(reply).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def run_mock_test(count):
+    global WEATHER_API, AIR_QUALITY_API, USE_CACHE
+    USE_CACHE = False   # Time the real fetching
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), MockOpenMeteo)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    WEATHER_API, AIR_QUALITY_API = f"{base}/v1/forecast", f"{base}/v1/air-quality"
+    locations = [(f"Place {n + 1}", 34 + n / 100, 138 + n / 100) for n in range(count)]
+
+    # The old way: one place after another, each request on a new connection
+    start = time.perf_counter()
+    for _, lat, lon in locations:
+        fetch_weather(requests, lat, lon)
+        fetch_air_quality(requests, lat, lon)
+    one_at_a_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = fetch_all(locations)
+    all_at_once = time.perf_counter() - start
+    server.shutdown()
+
+    print_table(results[:3])
+    print(f"{count} places, {2 * count} requests, {MOCK_LATENCY * 1000:.0f} ms per request:")
+    print(f"   One at a time :  {one_at_a_time:6.2f} s")
+    print(f"   All at once   :  {all_at_once:6.2f} s   ({one_at_a_time / all_at_once:.1f}x faster)")
+    print(" ")
+
+
+# Main function to get the data for every place and display it
+if __name__ == '__main__':
+    args = sys.argv[1:]
+
+    if args and args[0] == "--mock-test":
+        run_mock_test(int(args[1]) if len(args) > 1 else 10)
+        sys.exit(0)
+
+    try:
+        if not args:
+            locations = DEFAULT_LOCATIONS
+        elif args[0] == "--file" and len(args) == 2:
+            locations = load_locations(args[1])
+        else:
+            locations = [(arg, *map(float, arg.split(","))) for arg in args]
+            if any(len(location) != 3 for location in locations):
+                raise ValueError
+    except (OSError, ValueError, IndexError):
+        print("")
+        print("Please give places as latitude,longitude pairs, or a file of \"Name latitude longitude\" lines.")
+        print(f"Usage: python3 {sys.argv[0]} [lat,lon lat,lon ...]  or  [--file places.txt]  or  [--mock-test [places]]")
+        sys.exit(1) # Exit with an error code
+
+    print("")
+    print(f"Looking up the weather and air quality for {len(locations)} places...")
+    print_table(fetch_all(locations))
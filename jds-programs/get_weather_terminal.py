@@ -10,74 +10,233 @@
 #
 # No API key is necessary.
 #
+# 2026-10-18
+#    - Answers are cached (see api_cache.py) until Open-Meteo's next update,
+#      so looking at the same place again is instant and works offline
+#    - Added --hourly and --daily forecasts (FORECAST_DAYS days, or --days N
+#      up to 16). Both come from one request; --hourly shows each day as
+#      sparklines (one mark per hour), --daily as a table. They use the same
+#      JMA model (WEATHER_MODEL) as the current weather, which only goes out
+#      about 11 days, so later days are shown as "-"
+#    - convert_wind_to_compass() now looks the direction up in a table
+#      instead of going through 17 if/elif checks, and
+#      convert_winds_to_compass() does a whole column of directions at once
+#
+# Use  -- python3 get_weather_terminal.py [latitude] [longitude]
+#         python3 get_weather_terminal.py --hourly [latitude] [longitude]
+#         python3 get_weather_terminal.py --daily --days 10 [latitude] [longitude]
+#
 #################################################################################################
 
 import requests
 import sys
+import time
+from array import array
+
+from api_cache import cached_get_json
 
 
 # CONFIGURATION FOR WEATHER API (Open-Metro https://open-meteo.com/en/docs/jma-api)
 DEFAULT_LATITUDE = '34.9717465'
 DEFAULT_LONGITUDE = '138.378599'
+WEATHER_API = 'https://api.open-meteo.com/v1/forecast'
+WEATHER_MODEL = 'jma_seamless'   # Used for both the current weather and the forecasts
+FORECAST_DAYS = 7    # Days shown by --hourly and --daily (Open-Meteo allows up to 16)
+HOURLY_FIELDS = ('temperature_2m', 'precipitation', 'wind_speed_10m', 'wind_direction_10m',
+                 'relative_humidity_2m', 'cloud_cover')
+DAILY_FIELDS = ('weather_code', 'temperature_2m_max', 'temperature_2m_min', 'precipitation_sum',
+                'precipitation_probability_max', 'wind_speed_10m_max', 'wind_direction_10m_dominant')
+
+# The 16 compass points, each covering 22.5 degrees from 0 (so N is 0 up to 22.5, and 360)
+COMPASS_POINTS = ("N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE",
+                  "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW")
+
+# Short descriptions of the WMO weather codes Open-Meteo uses
+WEATHER_CODES = {
+    0: "Clear", 1: "Mostly clear", 2: "Partly cloudy", 3: "Overcast", 45: "Fog", 48: "Icy fog",
+    51: "Light drizzle", 53: "Drizzle", 55: "Heavy drizzle", 56: "Freezing drizzle", 57: "Freezing drizzle",
+    61: "Light rain", 63: "Rain", 65: "Heavy rain", 66: "Freezing rain", 67: "Freezing rain",
+    71: "Light snow", 73: "Snow", 75: "Heavy snow", 77: "Snow grains",
+    80: "Light showers", 81: "Showers", 82: "Heavy showers", 85: "Snow showers", 86: "Heavy snow showers",
+    95: "Thunderstorm", 96: "Storm with hail", 99: "Storm with hail",
+}
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+NAN = float('nan')
 
 
 # Function to convert wind direction (degrees) to compass directions
 def convert_wind_to_compass(wind_dir):
-    if wind_dir >= 0 and wind_dir < 22.5:
-        return "N"
-    elif wind_dir >= 22.5 and wind_dir < 45:
-        return "NNE"
-    elif wind_dir >= 45 and wind_dir < 67.5:
-        return "NE"
-    elif wind_dir >= 67.5 and wind_dir < 90:
-        return "ENE"
-    elif wind_dir >= 90 and wind_dir < 112.5:
-        return "E"
-    elif wind_dir >= 112.5 and wind_dir < 135:
-        return "ESE"
-    elif wind_dir >= 135 and wind_dir < 157.5:
-        return "SE"
-    elif wind_dir >= 157.5 and wind_dir < 180:
-        return "SSE"
-    elif wind_dir >= 180 and wind_dir < 202.5:
-        return "S"
-    elif wind_dir >= 202.5 and wind_dir < 225:
-        return "SSW"
-    elif wind_dir >= 225 and wind_dir < 247.5:
-        return "SW"
-    elif wind_dir >= 247.5 and wind_dir < 270:
-        return "WSW"
-    elif wind_dir >= 270 and wind_dir < 292.5:
-        return "W"
-    elif wind_dir >= 292.5 and wind_dir < 315:
-        return "WNW"
-    elif wind_dir >= 315 and wind_dir < 337.5:
-        return "NW"
-    elif wind_dir >= 337.5 and wind_dir < 360:
-        return "NNW"
-    elif wind_dir == 360:
-        return "N"
-    else: # Handle potential unexpected values
+    if wind_dir is None or not 0 <= wind_dir <= 360:   # Handle potential unexpected values (NaN too)
         return "Unknown"
+    return COMPASS_POINTS[int(wind_dir // 22.5) % 16]
+
+
+# The same, for a whole column of directions at once
+def convert_winds_to_compass(wind_dirs):
+    points = COMPASS_POINTS
+    return [points[int(d // 22.5) % 16] if d is not None and 0 <= d <= 360 else "Unknown" for d in wind_dirs]
+
+
+# --- Forecasts (--hourly and --daily) ---
+def decode_columns(block, fields):
+    """
+    Turns one of Open-Meteo's "hourly"/"daily" blocks into compact columns:
+    "time" stays a list of Unix times, every field becomes an array of floats (NaN where missing).
+    """
+    columns = {"time": block["time"]}
+    for field in fields:
+        columns[field] = array('d', (NAN if value is None else value for value in block[field]))
+    return columns
+
+
+def fetch_forecast(latitude, longitude, days):
+    """Gets the hourly and daily forecasts in one request. Returns (hourly, daily, utc_offset_seconds)."""
+    params = {"latitude": latitude, "longitude": longitude,
+              "hourly": ",".join(HOURLY_FIELDS), "daily": ",".join(DAILY_FIELDS),
+              "forecast_days": days, "timezone": "Asia/Tokyo", "timeformat": "unixtime",
+              "wind_speed_unit": "ms", "models": WEATHER_MODEL}
+    data = cached_get_json(WEATHER_API, params)
+    return (decode_columns(data["hourly"], HOURLY_FIELDS), decode_columns(data["daily"], DAILY_FIELDS),
+            data.get("utc_offset_seconds", 0))
+
+
+def value_range(values):
+    """(lowest, highest), skipping NaN. Both are NaN if there's nothing to go on."""
+    present = [v for v in values if v == v]
+    return (min(present), max(present)) if present else (NAN, NAN)
+
+
+def sparkline(values, low, high, blank_zero=False):
+    """One character per value, from ▁ (low) to █ (high); a space where the value is missing (or zero)."""
+    span = high - low
+    top = len(SPARK_CHARS) - 1
+    chars = []
+    for v in values:
+        if v != v or (blank_zero and v == 0):
+            chars.append(" ")
+        elif not span > 0:
+            chars.append(SPARK_CHARS[0])
+        else:
+            chars.append(SPARK_CHARS[min(int((v - low) / span * len(SPARK_CHARS)), top)])
+    return "".join(chars)
+
+
+def number(value, width, decimals=1):
+    return f"{value:>{width}.{decimals}f}" if value == value else f"{'-':>{width}}"
+
+
+def day_label(unix_time, utc_offset):
+    return time.strftime('%a %m/%d', time.gmtime(unix_time + utc_offset))
+
+
+def print_hourly(hourly, utc_offset):
+    # Split the hours into local days
+    days = []
+    for i, t in enumerate(hourly["time"]):
+        day = (t + utc_offset) // 86400
+        if not days or days[-1][0] != day:
+            days.append((day, i, i))
+        days[-1] = (day, days[-1][1], i + 1)
+
+    compass = convert_winds_to_compass(hourly["wind_direction_10m"])
+    wind = hourly["wind_speed_10m"]
+
+    def wind_summary(start, end):
+        low, high = value_range(wind[start:end])
+        if high != high:
+            return ""
+        strongest = max(range(start, end), key=lambda i: wind[i] if wind[i] == wind[i] else -1)
+        return f"{high:5.1f} max ({compass[strongest]})"
+
+    sections = [
+        ("Temperature (°C)", "temperature_2m", False,
+         lambda start, end: "{} to {}".format(*(number(v, 5) for v in value_range(hourly["temperature_2m"][start:end])))),
+        ("Rain (mm)", "precipitation", True,
+         lambda start, end: f"{sum(v for v in hourly['precipitation'][start:end] if v == v):5.1f} total"),
+        ("Wind (mps)", "wind_speed_10m", False, wind_summary),
+        ("Humidity (%)", "relative_humidity_2m", False,
+         lambda start, end: "{} to {}".format(*(number(v, 3, 0) for v in value_range(hourly["relative_humidity_2m"][start:end])))),
+        ("Cloud Coverage (%)", "cloud_cover", False,
+         lambda start, end: "{} to {}".format(*(number(v, 3, 0) for v in value_range(hourly["cloud_cover"][start:end])))),
+    ]
+
+    line = "-" * 64
+    print(f" ")
+    print(line)
+    print(f"    Hourly Forecast (each mark is one hour, midnight to 11 pm)")
+    print(line)
+    for title, field, blank_zero, summary in sections:
+        low, high = value_range(hourly[field])   # One scale for every day, so days can be compared
+        print(f"   {title}")
+        for _, start, end in days:
+            marks = sparkline(hourly[field][start:end], 0 if blank_zero else low, high, blank_zero)
+            print(f"   {day_label(hourly['time'][start], utc_offset)}  {marks:<24}  {summary(start, end)}")
+    print(line)
+    print(f" ")
+
+
+def print_daily(daily, utc_offset):
+    line = "-" * 82
+    print(f" ")
+    print(line)
+    print(f"    {len(daily['time'])}-Day Forecast")
+    print(line)
+    print(f"   {'Day':<11} {'Weather':<18} {'High':>5} {'Low':>5} {'Rain mm':>8} {'Rain %':>7} {'Wind mps':>9}  Dir")
+    compass = convert_winds_to_compass(daily["wind_direction_10m_dominant"])
+    for i, t in enumerate(daily["time"]):
+        code = daily["weather_code"][i]
+        weather = WEATHER_CODES.get(int(code), f"Code {int(code)}") if code == code else "-"
+        print(f"   {day_label(t, utc_offset):<11} {weather:<18} {number(daily['temperature_2m_max'][i], 5)}"
+              f" {number(daily['temperature_2m_min'][i], 5)} {number(daily['precipitation_sum'][i], 8)}"
+              f" {number(daily['precipitation_probability_max'][i], 7, 0)} {number(daily['wind_speed_10m_max'][i], 9)}"
+              f"  {compass[i] if compass[i] != 'Unknown' else '-'}")
+
+    # Highs and lows on one scale, so the two lines can be compared
+    low = value_range(daily["temperature_2m_min"])[0]
+    high = value_range(daily["temperature_2m_max"])[1]
+    print(f" ")
+    print(f"   {'Highs':<11} {sparkline(daily['temperature_2m_max'], low, high)}")
+    print(f"   {'Lows':<11} {sparkline(daily['temperature_2m_min'], low, high)}")
+    print(line)
+    print(f" ")
 
 
 
 # Main function to get weather data and display it
 if __name__ == '__main__':
 
+    # Pick out the forecast options, leaving just the latitude and longitude (if given)
+    args = sys.argv[1:]
+    modes = [arg for arg in args if arg in ('--hourly', '--daily')]
+    args = [arg for arg in args if arg not in modes]
+    days = FORECAST_DAYS
+    if '--days' in args:
+        try:
+            i = args.index('--days')
+            days = int(args[i + 1])
+            del args[i:i + 2]
+            if not 1 <= days <= 16:
+                raise ValueError
+        except (IndexError, ValueError):
+            print("")
+            print("--days must be a number from 1 to 16.")
+            print(f"Usage: python3 {sys.argv[0]} [--hourly] [--daily] [--days N] [latitude] [longitude]")
+            sys.exit(1) # Exit with an error code
+
     # Check if custom latitude and longitude are given at the command line
-    if len(sys.argv) == 3:
+    if len(args) == 2:
         try:
-            LATITUDE = float(sys.argv[1])
-            LONGITUDE = float(sys.argv[2])
+            LATITUDE = float(args[0])
+            LONGITUDE = float(args[1])
             print("")
             print(f"Looking up the weather for latitude {LATITUDE} and longitude {LONGITUDE}...")
         except ValueError:
             print("")
             print("Invalid latitude or longitude. Please provide numerical values.")
-            print(f"Usage: python3 {sys.argv[0]} [latitude] [longitude]")
+            print(f"Usage: python3 {sys.argv[0]} [--hourly] [--daily] [--days N] [latitude] [longitude]")
             sys.exit(1) # Exit with an error code
-    elif len(sys.argv) == 1:
+    elif len(args) == 0:
         print("")
         print(f"Looking up the weather for latitude {DEFAULT_LATITUDE} and longitude {DEFAULT_LONGITUDE}...")
         LATITUDE = DEFAULT_LATITUDE
@@ -85,18 +244,29 @@ if __name__ == '__main__':
     else:
         print("")
         print("Incorrect number of arguments.")
-        print(f"Usage: python3 {sys.argv[0]} [latitude] [longitude]")
+        print(f"Usage: python3 {sys.argv[0]} [--hourly] [--daily] [--days N] [latitude] [longitude]")
         sys.exit(1) # Exit with an error code
 
+    # Forecasts: one request for both, then print whichever were asked for
+    if modes:
+        try:
+            hourly, daily, utc_offset = fetch_forecast(LATITUDE, LONGITUDE, days)
+        except (requests.exceptions.RequestException, KeyError) as e:
+            print(f"Error fetching the forecast: {e}")
+            sys.exit(1)
+        if '--hourly' in modes:
+            print_hourly(hourly, utc_offset)
+        if '--daily' in modes:
+            print_daily(daily, utc_offset)
+        sys.exit(0)
+
 
-    WEATHER_API_URL = f'https://api.open-meteo.com/v1/forecast?latitude={LATITUDE}&longitude={LONGITUDE}&current=temperature_2m,relative_humidity_2m,apparent_temperature,is_day,precipitation,weather_code,cloud_cover,surface_pressure,wind_speed_10m,wind_direction_10m&timezone=Asia%2FTokyo&models=jma_seamless'
+    WEATHER_API_URL = f'https://api.open-meteo.com/v1/forecast?latitude={LATITUDE}&longitude={LONGITUDE}&current=temperature_2m,relative_humidity_2m,apparent_temperature,is_day,precipitation,weather_code,cloud_cover,surface_pressure,wind_speed_10m,wind_direction_10m&timezone=Asia%2FTokyo&models={WEATHER_MODEL}'
 
     # Fetch weather data
     weather_data = None
     try:
-        response_weather = requests.get(WEATHER_API_URL)
-        response_weather.raise_for_status()
-        weather_data = response_weather.json()
+        weather_data = cached_get_json(WEATHER_API_URL)
     except requests.exceptions.RequestException as e:
         print(f"Error fetching weather data: {e}")
 
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+#--------------------------------------------------------------------------------------
+# Heartbeat Agent
+# Jeffrey D. Shaffer and Generative-AI
+# 2026-10-18
+#
+# Sends a small "I'm alive" sample (uptime, load, memory, disk and battery) to the
+# IP-hub every few minutes. The hub keeps them, emails one daily summary of every
+# machine, and only emails otherwise when a machine stops checking in. This replaces
+# each machine sending its own daily_heartbeat.py email.
+#
+# Notes:
+#    - Only uses modules that come with Python (no venv needed)
+#    - Reads /proc and /sys directly, so it never starts another program
+#      (on a Mac only load and disk are sent, as there's no /proc or /sys)
+#    - The machine's name comes from $machine_name (see .bash_aliases), or the hostname
+#    - Tells the hub how often to expect it (SEND_EVERY), so the hub knows
+#      when a heartbeat has been missed
+#    - Be sure to update and check the "Configuration" below
+#
+# Use  -- python3 heartbeat_agent.py           # send one heartbeat
+#         python3 heartbeat_agent.py --print   # just show what would be sent
+#         python3 heartbeat_agent.py --loop    # send one every SEND_EVERY seconds
+#
+# ADD AS A CRONJOB (every 5 minutes, to match SEND_EVERY):
+#    crontab -e
+#    */5 * * * * /usr/bin/python3 /path/to/heartbeat_agent.py > /dev/null
+#
+#--------------------------------------------------------------------------------------
+
+import glob
+import http.client
+import json
+import os
+import socket
+import sys
+import time
+
+# Configuration
+RPI_HUB_IP = "192.168.1.1"    # Be sure to set this to the IP-hub's IP
+RPI_HUB_PORT = 5000
+HUB_TIMEOUT = 5               # Seconds to wait for the hub
+SEND_EVERY = 300              # Seconds between heartbeats (match the cron schedule)
+DISK_PATH = "/"               # Which disk's free space to report
+
+
+def read_first_line(path):
+    try:
+        with open(path, "r") as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+def read_uptime():
+    line = read_first_line("/proc/uptime")
+    return int(float(line.split()[0])) if line else None
+
+
+def read_memory():
+    """Returns [total kB, available kB] from /proc/meminfo, or None."""
+    wanted = {}
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("MemTotal", "MemAvailable"):
+                    wanted[key] = int(value.split()[0])
+                    if len(wanted) == 2:
+                        break
+    except OSError:
+        return None
+    if "MemTotal" not in wanted:
+        return None
+    return [wanted["MemTotal"], wanted.get("MemAvailable", 0)]
+
+
+def read_disk(path=DISK_PATH):
+    """Returns [total bytes, free bytes] of the disk holding path."""
+    stats = os.statvfs(path)
+    return [stats.f_blocks * stats.f_frsize, stats.f_bavail * stats.f_frsize]
+
+
+def read_battery(power_supply="/sys/class/power_supply"):
+    """Returns [percent, status] of the first battery, or None if there isn't one."""
+    for folder in sorted(glob.glob(os.path.join(power_supply, "BAT*"))):
+        capacity = read_first_line(os.path.join(folder, "capacity"))
+        if capacity and capacity.isdigit():
+            return [int(capacity), read_first_line(os.path.join(folder, "status")) or "Unknown"]
+    return None
+
+
+def machine_name():
+    return os.environ.get("machine_name") or socket.gethostname().split(".")[0]
+
+
+def take_sample():
+    try:
+        load = [round(value, 2) for value in os.getloadavg()]
+    except OSError:
+        load = None
+    return {
+        "hostname": machine_name(),
+        "every": SEND_EVERY,
+        "uptime": read_uptime(),
+        "load": load,
+        "mem": read_memory(),
+        "disk": read_disk(),
+        "battery": read_battery(),
+    }
+
+
+def send_sample(sample, conn=None):
+    """POSTs a sample to the hub's /heartbeat. Returns the (possibly new) connection, to reuse next time."""
+    body = json.dumps(sample, separators=(",", ":"))
+    for attempt in range(2):
+        if conn is None:
+            conn = http.client.HTTPConnection(RPI_HUB_IP, RPI_HUB_PORT, timeout=HUB_TIMEOUT)
+        try:
+            conn.request("POST", "/heartbeat", body, {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            reply = response.read()
+            break
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            conn = None
+            if attempt == 1:   # A kept-alive connection may have been closed by the hub, so retry once
+                raise
+    if response.status != 200:
+        raise http.client.HTTPException(f"The hub answered {response.status}: {reply[:200]!r}")
+    return conn
+
+
+# --- Main execution block ---
+if __name__ == "__main__":
+    args = sys.argv[1:]
+
+    if args == ["--print"]:
+        print(json.dumps(take_sample(), indent=3))
+        sys.exit(0)
+
+    if args == ["--loop"]:
+        conn = None
+        while True:
+            try:
+                conn = send_sample(take_sample(), conn)
+            except (OSError, http.client.HTTPException) as e:
+                print(f"Couldn't send a heartbeat to the hub: {e}", flush=True)
+                conn = None
+            time.sleep(SEND_EVERY - time.time() % SEND_EVERY)   # Stay on the same schedule
+
+    if args:
+        print(f"Usage: python3 {sys.argv[0]} [--print | --loop]")
+        sys.exit(1)
+
+    try:
+        send_sample(take_sample())
+        print("Heartbeat sent.")
+    except (OSError, http.client.HTTPException) as e:
+        print(f"Error: Couldn't send a heartbeat to the IP-hub at {RPI_HUB_IP}:{RPI_HUB_PORT} ({e})")
+        sys.exit(1)
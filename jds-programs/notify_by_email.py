@@ -9,6 +9,14 @@
 #         your gmail app password on line two.
 #
 # Use  -- python3 notify_by_email.py 'Cool Subject' 'Cool Message!'
+#         python3 notify_by_email.py --queue 'Cool Subject' 'Cool Message!'
+#
+# 2026-10-18
+#    - Added --queue, which leaves the message in the spool folder for
+#      notify_daemon.py to send (one SMTP login for many notifications);
+#      notify_queue.py does the same much faster, when speed matters
+#    - The settings file is now read by load_settings(), so notify_daemon.py
+#      can import this file without it exiting
 #
 ############################################################################################
 
@@ -22,42 +30,51 @@ import os # Import the os module to check for file existence
 # Define the path to your settings file
 SETTINGS_FILE = "notify_by_email_settings.txt"
 
-# Check if the settings file exists
-if not os.path.exists(SETTINGS_FILE):
-    print(f"Error: The settings file '{SETTINGS_FILE}' was not found.")
-    print("Please create this file in the same directory as the script with your email and app password on separate lines.")
-    exit(1) # Exit the script if the file is missing
 
-# Read email credentials from the file
-try:
-    with open(SETTINGS_FILE, 'r') as f:
-        EMAIL_ADDRESS = f.readline().strip() # Read first line for email, remove whitespace
-        APP_PASSWORD = f.readline().strip()  # Read second line for app password, remove whitespace
-except Exception as e:
-    print(f"Error reading settings from '{SETTINGS_FILE}': {e}")
-    print("Please ensure the file contains your email on the first line and app password on the second line.")
-    exit(1) # Exit if there's an error reading the file
+def load_settings(settings_file=SETTINGS_FILE):
+    # Check if the settings file exists
+    if not os.path.exists(settings_file):
+        print(f"Error: The settings file '{settings_file}' was not found.")
+        print("Please create this file in the same directory as the script with your email and app password on separate lines.")
+        exit(1) # Exit the script if the file is missing
+
+    # Read email credentials from the file
+    try:
+        with open(settings_file, 'r') as f:
+            email_address = f.readline().strip() # Read first line for email, remove whitespace
+            app_password = f.readline().strip()  # Read second line for app password, remove whitespace
+    except Exception as e:
+        print(f"Error reading settings from '{settings_file}': {e}")
+        print("Please ensure the file contains your email on the first line and app password on the second line.")
+        exit(1) # Exit if there's an error reading the file
+
+    # Ensure credentials are not empty
+    if not email_address or not app_password:
+        print(f"Error: Email address or app password found in '{settings_file}' is empty.")
+        print("Please ensure both lines in the file contain valid credentials.")
+        exit(1)
 
-# Ensure credentials are not empty
-if not EMAIL_ADDRESS or not APP_PASSWORD:
-    print(f"Error: Email address or app password found in '{SETTINGS_FILE}' is empty.")
-    print("Please ensure both lines in the file contain valid credentials.")
-    exit(1)
+    return email_address, app_password
 
 
 
 # SEND-EMAIL FUNCTION ----------------------------------------------------------------------
-def send_email_notification(message_subject, message_body):
+def build_message(email_address, message_subject, message_body):
     msg = MIMEText(f"{message_body}")     # The email body
-    msg['From'] = EMAIL_ADDRESS
-    msg['To'] = EMAIL_ADDRESS
+    msg['From'] = email_address
+    msg['To'] = email_address
     msg['Subject'] = f"{message_subject}"
-    
+    return msg
+
+
+def send_email_notification(message_subject, message_body):
+    email_address, app_password = load_settings()
+    msg = build_message(email_address, message_subject, message_body)
 
     # Send email
     try:
         server = smtplib.SMTP_SSL('smtp.gmail.com', 465)
-        server.login(EMAIL_ADDRESS, APP_PASSWORD)
+        server.login(email_address, app_password)
         server.send_message(msg)
         server.quit()
         # print("Email sent successfully!")
@@ -83,7 +100,17 @@ if __name__ == "__main__":
         help="The body content of the email."
     )
 
+    parser.add_argument(
+        "--queue",
+        action="store_true",
+        help="Put the email in the spool folder for notify_daemon.py to send, instead of sending it now."
+    )
+
     args = parser.parse_args() # Parse the arguments
 
     # Call the function with the parsed arguments
-    send_email_notification(args.subject, args.body)
+    if args.queue:
+        from notify_queue import queue_email
+        queue_email(args.subject, args.body)
+    else:
+        send_email_notification(args.subject, args.body)
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+#--------------------------------------------------------------------------------------
+# Notify Daemon (background sender for notify_by_email.py)
+# Jeffrey D. Shaffer and Generative-AI
+# 2026-10-18
+#
+# Sends the emails that scripts leave in the spool folder (notify_queue.py),
+# over one Gmail login that is kept open, instead of every script doing its own
+# TLS handshake and login.
+#
+# Notes:
+#    - Only uses modules that come with Python (no venv needed)
+#    - Needs notify_by_email_settings.txt (same as notify_by_email.py), read once at start
+#    - Messages are files in ~/.local/share/jds-notify/spool/new, one per email
+#      (written by notify_queue.py, or notify_by_email.py --queue),
+#      so nothing is lost if the daemon (or the machine) stops; they are sent next time
+#    - Messages that arrive together are waited for (COALESCE_SECONDS) and sent together;
+#      DIGEST_AFTER or more become one "digest" email instead of a pile of them
+#    - The SMTP session is checked with NOOP before reuse and closed after
+#      IDLE_CLOSE_SECONDS with nothing to send
+#    - If sending fails, it tries again after RETRY_SECONDS, doubling up to MAX_RETRY_SECONDS
+#      (with --once it gives up after ONCE_MAX_TRIES and exits with status 1)
+#    - Messages the server refuses outright (5xx) are moved to spool/failed
+#
+# Use  -- python3 notify_daemon.py                    # run forever, sending through Gmail
+#         python3 notify_daemon.py --once             # send what's queued, then exit
+#         python3 notify_daemon.py --smtp localhost:8025 --plain   # a local test server
+#
+# Start it at boot with cron:
+#    crontab -e
+#    @reboot cd ~/jds-programs && python3 notify_daemon.py >> /tmp/notify_daemon.log 2>&1
+#
+# To test without Gmail, run a local SMTP server that prints what it gets:
+#    pip install aiosmtpd
+#    python3 -m aiosmtpd -n -l localhost:8025
+#
+#--------------------------------------------------------------------------------------
+
+import json
+import os
+import smtplib
+import ssl
+import sys
+import time
+
+from notify_by_email import build_message, load_settings
+from notify_queue import SPOOL_FOLDER
+
+# Configuration
+SMTP_HOST = "smtp.gmail.com"
+SMTP_PORT = 465
+SMTP_TIMEOUT = 30          # Seconds to wait for the SMTP server
+POLL_SECONDS = 1           # How often to look in the spool folder
+COALESCE_SECONDS = 5       # Wait this long after the newest message for more to arrive
+MAX_WAIT_SECONDS = 30      # ...but never hold the oldest message longer than this
+BATCH_SIZE = 50            # Most messages sent in one go
+DIGEST_AFTER = 3           # This many or more at once are sent as one digest email
+NOOP_AFTER_SECONDS = 30    # Check an idle session with NOOP before reusing it
+IDLE_CLOSE_SECONDS = 300   # Log out after this long with nothing to send
+RETRY_SECONDS = 5          # First wait after a failed send
+MAX_RETRY_SECONDS = 900    # Longest wait between tries
+ONCE_MAX_TRIES = 4         # With --once, give up after this many failed tries in a row
+
+
+def log(message):
+    print(f"{time.strftime('%Y-%m-%d %H:%M:%S')}  {message}", flush=True)
+
+
+# --- Spool folder ---
+def queued_files(spool_folder=SPOOL_FOLDER):
+    try:
+        names = [name for name in os.listdir(os.path.join(spool_folder, "new")) if name.endswith(".json")]
+    except FileNotFoundError:
+        return []
+    return [os.path.join(spool_folder, "new", name) for name in sorted(names)]
+
+
+def load_message(path):
+    try:
+        with open(path, "r") as f:
+            message = json.load(f)
+        return message["subject"], message["body"], message["queued_at"]
+    except FileNotFoundError:   # Already taken care of (by another daemon, or by hand)
+        return None
+    except (OSError, ValueError, KeyError) as e:
+        log(f"Skipping unreadable message {os.path.basename(path)}: {e}")
+        move_to_failed(path)
+        return None
+
+
+def move_to_failed(path):
+    failed_folder = os.path.join(os.path.dirname(os.path.dirname(path)), "failed")
+    os.makedirs(failed_folder, exist_ok=True)
+    try:
+        os.replace(path, os.path.join(failed_folder, os.path.basename(path)))
+    except FileNotFoundError:
+        pass
+
+
+# Several messages in one email, oldest first
+def make_digest(messages):
+    subjects = ", ".join(subject for subject, _, _ in messages)
+    subject = f"{len(messages)} notifications: {subjects}"
+    if len(subject) > 120:
+        subject = subject[:117] + "..."
+    parts = []
+    for message_subject, message_body, queued_at in messages:
+        when = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(queued_at))
+        parts.append(f"--- {message_subject}  ({when}) ---\n{message_body}\n")
+    return subject, "\n".join(parts)
+
+
+# --- SMTP session ---
+class SMTPSession:
+    """One logged-in SMTP connection, opened when needed and reused while it's alive."""
+
+    def __init__(self, email_address, app_password, host=SMTP_HOST, port=SMTP_PORT, use_ssl=True):
+        self.email_address = email_address
+        self.app_password = app_password
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.server = None
+        self.last_used = 0
+
+    def connect(self):
+        if self.use_ssl:
+            self.server = smtplib.SMTP_SSL(self.host, self.port, timeout=SMTP_TIMEOUT,
+                                           context=ssl.create_default_context())
+        else:
+            self.server = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT)
+        self.server.ehlo()
+        if self.server.has_extn("auth"):   # A local test server may not ask for a login
+            self.server.login(self.email_address, self.app_password)
+        self.last_used = time.monotonic()
+        log(f"Connected to {self.host}:{self.port}")
+
+    # Reuse the session if it still answers, otherwise log in again
+    def ensure_connected(self):
+        if self.server is not None and time.monotonic() - self.last_used > NOOP_AFTER_SECONDS:
+            try:
+                if self.server.noop()[0] != 250:
+                    raise smtplib.SMTPException("NOOP refused")
+            except (smtplib.SMTPException, OSError):
+                self.close()
+        if self.server is None:
+            self.connect()
+
+    def send(self, subject, body):
+        self.ensure_connected()
+        self.server.send_message(build_message(self.email_address, subject, body))
+        self.last_used = time.monotonic()
+
+    def close_if_idle(self):
+        if self.server is not None and time.monotonic() - self.last_used > IDLE_CLOSE_SECONDS:
+            log("Idle, logging out")
+            self.close()
+
+    def close(self):
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self.server = None
+
+
+# --- Delivery ---
+def is_permanent(error):
+    """True if the server refused the message itself (5xx), so trying again won't help."""
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return False   # A bad password isn't the message's fault
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+
+# Wait for a burst of messages to finish arriving, so they can go out together
+def wait_for_burst(spool_folder):
+    files = queued_files(spool_folder)
+    first_seen = time.monotonic()
+    while len(files) < BATCH_SIZE and time.monotonic() - first_seen < MAX_WAIT_SECONDS:
+        newest = 0
+        for path in files:
+            try:
+                newest = max(newest, os.stat(path).st_mtime)
+            except FileNotFoundError:   # Taken away since the folder was listed
+                pass
+        if time.time() - newest >= COALESCE_SECONDS:
+            break
+        time.sleep(POLL_SECONDS)
+        files = queued_files(spool_folder)
+    return files[:BATCH_SIZE]
+
+
+def deliver(session, files):
+    """Sends the messages in files (as one digest if there are many), deleting each once sent."""
+    loaded = [(path, load_message(path)) for path in files]
+    loaded = [(path, message) for path, message in loaded if message]
+    if not loaded:
+        return
+
+    if len(loaded) >= DIGEST_AFTER:
+        emails = [(make_digest([message for _, message in loaded]), [path for path, _ in loaded])]
+    else:
+        emails = [((subject, body), [path]) for path, (subject, body, _) in loaded]
+
+    for (subject, body), paths in emails:
+        try:
+            session.send(subject, body)
+        except smtplib.SMTPException as e:
+            if not is_permanent(e):
+                raise
+            log(f"The server refused \"{subject}\" ({e}); moving it to the failed folder")
+            for path in paths:
+                move_to_failed(path)
+            continue
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        log(f"Sent \"{subject}\"")
+
+
+def run(session, spool_folder=SPOOL_FOLDER, once=False):
+    """Sends queued email forever, or with once=True until the spool is empty (returns 0, or 1 if it gave up)."""
+    retry_seconds = RETRY_SECONDS
+    failures = 0
+    while True:
+        files = queued_files(spool_folder)
+        if not files:
+            if once:
+                session.close()
+                return 0
+            session.close_if_idle()
+            time.sleep(POLL_SECONDS)
+            continue
+
+        if not once:
+            files = wait_for_burst(spool_folder)
+        else:
+            files = files[:BATCH_SIZE]
+
+        try:
+            deliver(session, files)
+            retry_seconds = RETRY_SECONDS
+            failures = 0
+        except (smtplib.SMTPException, OSError) as e:
+            session.close()
+            failures += 1
+            if once and failures >= ONCE_MAX_TRIES:
+                log(f"Sending failed ({e}); giving up after {failures} tries")
+                return 1
+            log(f"Sending failed ({e}); trying again in {retry_seconds} seconds")
+            time.sleep(retry_seconds)
+            retry_seconds = min(retry_seconds * 2, MAX_RETRY_SECONDS)
+
+
+# --- Main execution block ---
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    once = "--once" in args
+    use_ssl = "--plain" not in args
+    host, port = SMTP_HOST, SMTP_PORT
+    try:
+        if "--smtp" in args:
+            host, port = args[args.index("--smtp") + 1].rsplit(":", 1)
+            port = int(port)
+    except (IndexError, ValueError):
+        print(f"Usage: python3 {sys.argv[0]} [--once] [--smtp host:port] [--plain]")
+        sys.exit(1)
+
+    email_address, app_password = load_settings()
+    session = SMTPSession(email_address, app_password, host, port, use_ssl)
+    log(f"Sending queued email from {SPOOL_FOLDER} through {host}:{port}")
+    try:
+        sys.exit(run(session, once=once))
+    except KeyboardInterrupt:
+        session.close()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+#--------------------------------------------------------------------------------------
+# Notify Queue (fast way to send a notification)
+# Jeffrey D. Shaffer and Generative-AI
+# 2026-10-18
+#
+# Drops an email into the spool folder and returns right away, leaving the sending
+# to notify_daemon.py. Takes the same arguments as notify_by_email.py, but doesn't
+# wait for Gmail, so it's fine to call from loops and scripts that are in a hurry.
+#
+# Notes:
+#    - Only imports what Python has already loaded at start-up (plus json), so it
+#      finishes in a few milliseconds more than "python3 -c pass"
+#    - Doesn't read the settings file or touch the network (notify_daemon.py does that)
+#    - Each message is written to spool/tmp and renamed into spool/new, so the
+#      daemon never picks up half a message
+#    - Run with "python3 -S" to also skip loading site-packages (faster still)
+#    - See benchmark_notify.py for timings against notify_by_email.py
+#
+# Use  -- python3 notify_queue.py 'Cool Subject' 'Cool Message!'
+#
+# It can also be imported by other scripts:
+#         from notify_queue import queue_email
+#         queue_email("Cool Subject", "Cool Message!")
+#
+#--------------------------------------------------------------------------------------
+
+import json
+import os
+import sys
+import time
+
+# Configuration
+SPOOL_FOLDER = os.path.join(os.path.expanduser("~"), ".local", "share", "jds-notify", "spool")
+
+
+# Maildir style: a message is written in "tmp" and renamed into "new" when complete
+def queue_email(subject, body, spool_folder=SPOOL_FOLDER):
+    """Leaves an email in the spool folder for the daemon. Returns the message file's path."""
+    now = time.time_ns()
+    name = f"{now}.{os.getpid()}.json"   # Sorts oldest first
+    temp_file = os.path.join(spool_folder, "tmp", name)
+    message = json.dumps({"subject": subject, "body": body, "queued_at": now / 1e9})
+    try:
+        f = open(temp_file, "w")
+    except FileNotFoundError:   # First message ever, make the folders
+        for folder in ("tmp", "new"):
+            os.makedirs(os.path.join(spool_folder, folder), exist_ok=True)
+        f = open(temp_file, "w")
+    with f:
+        f.write(message)
+    path = os.path.join(spool_folder, "new", name)
+    os.replace(temp_file, path)
+    return path
+
+
+# --- Main execution block ---
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(f"Usage: python3 {sys.argv[0]} 'Subject' 'Body'")
+        sys.exit(1)
+    queue_email(sys.argv[1], sys.argv[2])
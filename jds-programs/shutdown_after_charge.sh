@@ -24,6 +24,12 @@
 #       line to the bottom of the sudoers.tmp file:
 #       USERNAME ALL=(ALL) NOPASSWD: /sbin/shutdown
 #
+# 2026-10-18
+#    - On Linux, battery_watcher.py does the same job without
+#      polling every minute (it wakes up when the kernel says
+#      the battery changed), and spots a stalled charge from
+#      the charge rate over the last half hour
+#
 #---------------------------------------------------------
 
 
@@ -1,7 +1,7 @@
 #-----------------------------------------------------------------------
-# Webcam-Streamer -- v1.2
+# Webcam-Streamer -- v1.7
 # Jeffrey D. Shaffer & Gemini
-# 2025-07-25
+# 2026-10-18
 #
 # Notes:
 #    - Broadcasts the default webcam via a webserver at this address:
@@ -11,11 +11,61 @@
 #    - Also requires special permission for the user to access video:
 #         sudo usermod -a -G video $USER
 #
+# 2026-10-18
+#    - The webcam is now opened once, by a single background thread,
+#      and each frame is encoded once and shared by every viewer.
+#      Any number of people can watch at the same time, a viewer on
+#      a slow connection just skips frames, and the webcam is
+#      released a few seconds after the last viewer leaves
+#    - MJPEG passthrough: when the webcam sends MJPEG, its JPEG bytes
+#      are now sent to viewers as-is instead of being decoded and
+#      re-encoded (which used up most of a Raspberry Pi's CPU). If the
+#      webcam or OpenCV can't do that, frames are re-encoded like before
+#    - To compare the CPU used per frame:  python3 benchmark_webcam.py
+#    - Each viewer can now ask for a lower frame rate, JPEG quality
+#      or size, for example:
+#         http://<DEVICE_IP_ADDRESS>:8080/video_feed?fps=10&quality=60&scale=2
+#      Without quality/scale, the stream adjusts itself: if frames take
+#      too long to send (slow Wi-Fi) it steps down through
+#      ADAPTIVE_STEPS, and steps back up once the connection keeps up.
+#      Viewers on the same settings share the same encoded frames
+#    - Motion gating: each frame is shrunk to a tiny grayscale picture
+#      and compared with the last one sent. When no part of it has
+#      changed, frames aren't encoded or sent, apart from one every
+#      STILL_FRAME_SECONDS so viewers know the stream is still alive
+#    - The newest frame is also available as a plain picture, straight
+#      from memory (it never opens the webcam), for dashboards to poll:
+#         http://<DEVICE_IP_ADDRESS>:8080/snapshot.jpg
+#    - Recording (off unless started with --record, or RECORDING = True):
+#      every frame sent is also saved to ~/webcam_recordings in
+#      SEGMENT_BYTES files (plain MJPEG, so "ffplay -f mjpeg" can play
+#      them), keeping the newest MAX_SEGMENTS and deleting the oldest.
+#      The webcam stays on while recording, even with no viewers, and
+#      MAX_SEGMENTS x SEGMENT_BYTES of disk (2 GB) gets used, so only
+#      turn it on where that's wanted (and not on a small SD card).
+#         python3 webcam_streamer.py --record
+#      Any stretch can be watched again with:
+#         http://<DEVICE_IP_ADDRESS>:8080/replay?from=2026-10-18T14:00&to=2026-10-18T14:05
+#      ("from" and "to" can also be Unix times, "to" defaults to now,
+#      and "&speed=4" plays it back 4x faster)
+#
 #-----------------------------------------------------------------------
 
 
+import bisect
+import collections
+import datetime
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+
 import cv2
-from flask import Flask, Response
+import numpy as np
+from flask import Flask, Response, request
 
 app = Flask(__name__)
 
@@ -26,18 +76,45 @@ RESOLUTION_WIDTH  = 1280
 RESOLUTION_HEIGHT = 1024
 FRAMERATE         =   30
 EXPOSURE          =  -12   # Between -10 and -12 are good for outdoors
+MJPEG_PASSTHROUGH = True   # Send the webcam's own JPEGs without re-encoding (if it can)
+
+# --- Configuration for Sharing Frames ---
+FRAME_BUFFER_SIZE    = 8   # Most recent encoded frames kept in memory
+VIEWER_GRACE_SECONDS = 5   # Keep the webcam open this long after the last viewer leaves
+FRAME_WAIT_SECONDS   = 2   # How often a waiting viewer checks the webcam is still running
+VARIANT_CACHE_SIZE   = 16  # Resized/re-compressed frames kept for viewers to share
+
+# --- Configuration for Motion Gating ---
+MOTION_GATING       = True       # Only send frames when the picture changes
+MOTION_SIZE         = (80, 64)   # Size of the grayscale picture that frames are compared at
+MOTION_THRESHOLD    = 16         # Change in gray level (0-255) for a spot to count as changed
+MOTION_MIN_AREA     = 0.002      # Fraction of the picture that has to change to count as motion
+STILL_FRAME_SECONDS = 1.0        # Send a frame at least this often, even with no motion
+
+# --- Configuration for Recording ---
+RECORDING        = False   # Or start with --record (keeps the webcam on and uses disk space)
+RECORDING_FOLDER = os.path.join(os.path.expanduser("~"), "webcam_recordings")
+SEGMENT_BYTES    = 32 * 1024 * 1024   # Size of each recording file
+MAX_SEGMENTS     = 64                 # Files kept before the oldest is deleted (64 x 32 MB = 2 GB)
+CAMERA_RETRY_SECONDS = 10             # How often the recorder tries the webcam again if it stops working
 
+# --- Configuration for Adapting to Slow Viewers ---
+ADAPTIVE_STEPS   = [(None, 1), (80, 1), (60, 1), (60, 2), (40, 2), (40, 4)]   # (JPEG quality, downscale) best to worst, None = as sent by the webcam
+SLOW_SEND_FRAMES = 3    # Step down after this many frames in a row that took longer than a frame to send
+FAST_SEND_FRAMES = 60   # Step back up after this many frames in a row sent in under a quarter of a frame
 
-# Capture frames from the webcam and encode them
-def generate_frames():
+ERROR_PART = (b'--frame\r\n'
+              b'Content-Type: text/plain\r\n\r\n'
+              b'Error: Webcam not accessible.\r\n')
+
+
+# Open the webcam and apply the settings above (returns None if it can't be opened)
+def open_camera():
     cap = cv2.VideoCapture(WEBCAM_INDEX)
 
     if not cap.isOpened():
         print(f"Error: Could not open webcam at index {WEBCAM_INDEX}. Make sure it's connected and not in use by another application.")
-        yield (b'--frame\r\n'
-               b'Content-Type: text/plain\r\n\r\n'
-               b'Error: Webcam not accessible.\r\n')
-        return
+        return None
 
     # Set preferred Codec before setting resolution and framerate
     cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
@@ -53,6 +130,10 @@ def generate_frames():
     # --- Set Exposure ---
     cap.set(cv2.CAP_PROP_EXPOSURE, EXPOSURE)
 
+    # --- Ask for the undecoded MJPEG data ---
+    if MJPEG_PASSTHROUGH:
+        cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+
     # Optional: Verify if the settings were applied (not all webcams support all resolutions/framerates)
     actual_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
     actual_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
@@ -63,26 +144,475 @@ def generate_frames():
     if actual_fps != FRAMERATE:
         print(f"Warning: Desired framerate {FRAMERATE} FPS not fully supported. Actual: {actual_fps} FPS")
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            print("Error: Failed to grab frame. End of stream or device error.")
-            break
+    return cap
+
+
+# True if a frame from cap.read() is the webcam's raw JPEG data rather than a decoded image
+def is_jpeg_buffer(frame):
+    return (frame.dtype == 'uint8' and frame.size > 2
+            and (frame.ndim == 1 or frame.shape[0] == 1)
+            and frame.flat[0] == 0xFF and frame.flat[1] == 0xD8)
+
+
+# Shrink a frame to a tiny grayscale picture for spotting motion (None if it can't be decoded)
+def motion_thumbnail(frame, passthrough):
+    if passthrough:
+        # Decoding the JPEG at 1/8 size and in gray skips most of the work
+        frame = cv2.imdecode(frame.reshape(-1), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+        if frame is None:
+            return None
+    else:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(frame, MOTION_SIZE, interpolation=cv2.INTER_AREA)
+
+
+# Re-compress a frame at a JPEG quality (None = OpenCV's default) and downscale factor.
+# Works from the decoded image if there is one, otherwise from the JPEG bytes.
+def encode_variant(frame_bytes, image, quality, scale):
+    if image is None:
+        # Decoding straight to 1/2, 1/4 or 1/8 size is much cheaper than decoding and resizing
+        reduced = {2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+        image = cv2.imdecode(np.frombuffer(frame_bytes, np.uint8), reduced.get(scale, cv2.IMREAD_COLOR))
+        if scale in reduced:
+            scale = 1
+    if scale > 1:
+        height, width = image.shape[:2]
+        image = cv2.resize(image, (width // scale, height // scale), interpolation=cv2.INTER_AREA)
+    params = [cv2.IMWRITE_JPEG_QUALITY, quality] if quality else []
+    ret, buffer = cv2.imencode('.jpg', image, params)
+    return buffer.tobytes() if ret else frame_bytes
+
+
+class FrameBroadcaster:
+    """
+    One background thread reads and encodes frames from the webcam into a small
+    ring buffer, and every viewer streams from that buffer. Viewers always jump
+    to the newest frame, so a slow one skips frames instead of holding up the
+    webcam or anyone else.
+
+    Lower quality or smaller versions of a frame are made when a viewer first
+    asks for them and kept in a small cache, so viewers on the same settings
+    share the work.
+    """
+
+    def __init__(self):
+        self.frames = collections.deque(maxlen=FRAME_BUFFER_SIZE)   # (sequence number, JPEG bytes, time.time())
+        self.sequence = 0
+        self.viewers = 0
+        self.failed = False
+        self._new_frame = threading.Condition()
+        self._thread = None
+        self._latest_image = (0, None)   # (sequence number, decoded image) when re-encoding
+        self._variants = collections.OrderedDict()   # (sequence, quality, scale) -> JPEG bytes
+        self._variants_lock = threading.Lock()
+        self._encoding = {}   # (sequence, quality, scale) -> lock held while that variant is encoded
+
+    def _add_viewer(self):
+        with self._new_frame:
+            self.viewers += 1
+            if self._thread is None:
+                self._start_capture()
+
+    def _remove_viewer(self):
+        with self._new_frame:
+            self.viewers -= 1
+
+    def ensure_capture(self):
+        """Starts the webcam again if it has stopped."""
+        with self._new_frame:
+            if self._thread is None:
+                self._start_capture()
+
+    def _start_capture(self):
+        # Called with self._new_frame held
+        self.failed = False
+        self._thread = threading.Thread(target=self._capture, daemon=True)
+        self._thread.start()
+
+    def _capture(self):
+        cap = open_camera()
+        lost_camera = cap is None
+        idle_since = None
+        passthrough = None   # Decided from the first frame
+        last_thumbnail, last_published = None, 0
+        try:
+            while cap is not None:
+                with self._new_frame:
+                    if self.viewers > 0:
+                        idle_since = None
+                    elif idle_since is None:
+                        idle_since = time.monotonic()
+                    elif time.monotonic() - idle_since > VIEWER_GRACE_SECONDS:
+                        break   # Nobody has been watching for a while
+
+                ret, frame = cap.read()
+                if not ret:
+                    print("Error: Failed to grab frame. End of stream or device error.")
+                    lost_camera = True
+                    break
+
+                if passthrough is None:
+                    passthrough = MJPEG_PASSTHROUGH and is_jpeg_buffer(frame)
+                    if passthrough:
+                        print("Sending the webcam's MJPEG frames without re-encoding.")
+                    else:
+                        print("MJPEG passthrough not available, re-encoding each frame as JPEG.")
+                        if frame.ndim != 3:
+                            # Raw data that isn't JPEG (e.g. YUYV), so let OpenCV decode it
+                            cap.set(cv2.CAP_PROP_CONVERT_RGB, 1)
+                            continue
+
+                if MOTION_GATING:
+                    thumbnail = motion_thumbnail(frame, passthrough)
+                    now = time.monotonic()
+                    if (thumbnail is not None and last_thumbnail is not None
+                            and now - last_published < STILL_FRAME_SECONDS
+                            and np.count_nonzero(cv2.absdiff(thumbnail, last_thumbnail) > MOTION_THRESHOLD)
+                                < MOTION_MIN_AREA * thumbnail.size):
+                        continue   # Nothing has changed since the last frame sent
+                    last_thumbnail, last_published = thumbnail, now
+
+                if passthrough:
+                    self.publish(frame.tobytes())
+                else:
+                    # Encode the frame as JPEG (just once, no matter how many viewers)
+                    ret, buffer = cv2.imencode('.jpg', frame)
+                    if ret:
+                        self.publish(buffer.tobytes(), frame)
+        finally:
+            if cap is not None:
+                cap.release()
+                print("Webcam released.")
+            with self._new_frame:
+                self._thread = None
+                self.failed = lost_camera
+                # Someone may have started watching just as we were stopping
+                if not lost_camera and self.viewers > 0:
+                    self._start_capture()
+                self._new_frame.notify_all()
+
+    def publish(self, frame_bytes, image=None):
+        """Adds an encoded frame (and its decoded image, if we have it) to the buffer and wakes up every viewer."""
+        with self._new_frame:
+            self.sequence += 1
+            self.frames.append((self.sequence, frame_bytes, time.time()))
+            self._latest_image = (self.sequence, image)
+            self._new_frame.notify_all()
+
+    def variant(self, sequence, frame_bytes, quality, scale):
+        """Returns a frame at a JPEG quality and downscale factor, encoding it only once for all viewers."""
+        if quality is None and scale == 1:
+            return frame_bytes
+        key = (sequence, quality, scale)
+        with self._variants_lock:
+            if key in self._variants:
+                self._variants.move_to_end(key)
+                return self._variants[key]
+            key_lock = self._encoding.setdefault(key, threading.Lock())
+
+        # Encode without holding _variants_lock, so viewers on other settings aren't held up.
+        # Viewers who want this same variant wait on key_lock and then share it
+        with key_lock:
+            with self._variants_lock:
+                if key in self._variants:
+                    return self._variants[key]
+            try:
+                image_sequence, image = self._latest_image
+                variant_bytes = encode_variant(frame_bytes, image if image_sequence == sequence else None,
+                                               quality, scale)
+                with self._variants_lock:
+                    self._variants[key] = variant_bytes
+                    if len(self._variants) > VARIANT_CACHE_SIZE:
+                        self._variants.popitem(last=False)
+            finally:
+                with self._variants_lock:
+                    self._encoding.pop(key, None)
+        return variant_bytes
+
+    def latest_frame(self):
+        """Returns the newest (sequence, JPEG bytes, time) without waiting, or None if there isn't one yet."""
+        with self._new_frame:
+            return self.frames[-1] if self.frames else None
+
+    def next_frame(self, last_sequence):
+        """Waits for a frame newer than last_sequence and returns (sequence, JPEG bytes, time), or None."""
+        with self._new_frame:
+            self._new_frame.wait_for(
+                lambda: self.sequence > last_sequence or self._thread is None,
+                FRAME_WAIT_SECONDS)
+            if self.sequence > last_sequence and self.frames:
+                return self.frames[-1]
+            return None
+
+    def frames_since(self, last_sequence):
+        """Like next_frame(), but returns every frame newer than last_sequence still in the buffer."""
+        with self._new_frame:
+            self._new_frame.wait_for(
+                lambda: self.sequence > last_sequence or self._thread is None,
+                FRAME_WAIT_SECONDS)
+            return [frame for frame in self.frames if frame[0] > last_sequence]
+
+    def stream(self, fps=None, quality=None, scale=None):
+        """
+        Yields multipart JPEG parts for one viewer, at most fps frames a second.
+        A fixed quality or scale turns off adapting to the viewer's connection.
+        """
+        frame_seconds = 1 / fps if fps else 1 / FRAMERATE
+        adaptive = quality is None and scale is None
+        step, slow_frames, fast_frames = 0, 0, 0
+
+        self._add_viewer()
+        try:
+            last_sequence = self.sequence
+            while True:
+                latest = self.next_frame(last_sequence)
+                if latest is None:
+                    if self._thread is not None:
+                        continue   # Still opening the webcam, keep waiting
+                    if self.failed:
+                        yield ERROR_PART
+                    break
+                last_sequence, frame_bytes, _ = latest
 
-        # Encode the frame as JPEG
-        ret, buffer = cv2.imencode('.jpg', frame)
-        frame_bytes = buffer.tobytes()
+                if adaptive:
+                    quality, scale = ADAPTIVE_STEPS[step]
+                frame_bytes = self.variant(last_sequence, frame_bytes, quality, scale or 1)
 
+                # The next frame is asked for once this one has been sent, so the
+                # time in between shows how well the viewer's connection keeps up
+                send_start = time.monotonic()
+                yield (b'--frame\r\n'
+                       b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+                send_seconds = time.monotonic() - send_start
+
+                if adaptive:
+                    if send_seconds > frame_seconds:
+                        slow_frames, fast_frames = slow_frames + 1, 0
+                        if slow_frames >= SLOW_SEND_FRAMES and step < len(ADAPTIVE_STEPS) - 1:
+                            step, slow_frames = step + 1, 0
+                    elif send_seconds < frame_seconds / 4:
+                        slow_frames, fast_frames = 0, fast_frames + 1
+                        if fast_frames >= FAST_SEND_FRAMES and step > 0:
+                            step, fast_frames = step - 1, 0
+                    else:
+                        slow_frames, fast_frames = 0, 0
+
+                # Skip frames to stay under the viewer's frame rate
+                time.sleep(max(0, send_start + frame_seconds - time.monotonic()))
+        finally:
+            self._remove_viewer()
+
+
+broadcaster = FrameBroadcaster()
+
+
+class Segment:
+    """One recording file, plus its index of when each frame was taken and where it is in the file."""
+
+    INDEX_ENTRY = struct.Struct('<dQI')   # time.time(), offset, length
+
+    def __init__(self, folder, start_time):
+        self.start_time = start_time
+        self.path = os.path.join(folder, f"{int(start_time * 1000)}.mjpeg")
+        self.index_path = self.path[:-len(".mjpeg")] + ".idx"
+        self.times = array('d')
+        self.offsets = array('Q')
+        self.lengths = array('I')
+
+    @property
+    def size(self):
+        return self.offsets[-1] + self.lengths[-1] if self.offsets else 0
+
+    @property
+    def end_time(self):
+        return self.times[-1] if self.times else self.start_time
+
+    def load_index(self):
+        with open(self.index_path, 'rb') as f:
+            data = f.read()
+        usable = len(data) - len(data) % self.INDEX_ENTRY.size   # Ignore a half-written last entry
+        for frame_time, offset, length in self.INDEX_ENTRY.iter_unpack(data[:usable]):
+            self.times.append(frame_time)
+            self.offsets.append(offset)
+            self.lengths.append(length)
+
+    def delete(self):
+        for path in (self.path, self.index_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class SegmentRecorder:
+    """
+    Saves the frames the broadcaster sends out into a ring of fixed-size segment
+    files. It reads them from the broadcaster's frame buffer like any viewer, on
+    its own thread, so a slow disk can never hold up the live stream (if it falls
+    more than FRAME_BUFFER_SIZE frames behind, the missed frames aren't recorded).
+    """
+
+    def __init__(self, folder=RECORDING_FOLDER, segment_bytes=SEGMENT_BYTES, max_segments=MAX_SEGMENTS):
+        self.folder = folder
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self.segments = []   # Oldest first, the last one is being written
+        self._lock = threading.Lock()
+        self._data_file = None
+        self._index_file = None
+
+        # Pick up the recordings already on disk
+        os.makedirs(folder, exist_ok=True)
+        for name in sorted(os.listdir(folder), key=lambda n: (len(n), n)):
+            if name.endswith(".idx"):
+                try:
+                    segment = Segment(folder, int(name[:-len(".idx")]) / 1000)
+                except ValueError:
+                    continue   # Not one of ours
+                segment.load_index()
+                self.segments.append(segment)
+        print(f"Recording to {folder} ({len(self.segments)} segments already there)")
+
+    def start(self, broadcaster):
+        threading.Thread(target=self._run, args=(broadcaster,), daemon=True).start()
+
+    def _run(self, broadcaster):
+        broadcaster._add_viewer()   # Keeps the webcam on
+        last_sequence = broadcaster.sequence
+        while True:
+            frames = broadcaster.frames_since(last_sequence)
+            if not frames:
+                if broadcaster._thread is None:
+                    time.sleep(CAMERA_RETRY_SECONDS)
+                    broadcaster.ensure_capture()
+                continue
+            missed = frames[0][0] - last_sequence - 1
+            if missed > 0 and last_sequence:
+                print(f"Warning: Recording fell behind, {missed} frames were not saved.")
+            for last_sequence, frame_bytes, frame_time in frames:
+                self._write(frame_bytes, frame_time)
+
+    def _write(self, frame_bytes, frame_time):
+        segment = self.segments[-1] if self._data_file else None
+        if segment is None or segment.size + len(frame_bytes) > self.segment_bytes:
+            segment = self._next_segment(frame_time)
+
+        offset = segment.size
+        self._data_file.write(frame_bytes)
+        self._data_file.flush()
+        self._index_file.write(Segment.INDEX_ENTRY.pack(frame_time, offset, len(frame_bytes)))
+        self._index_file.flush()
+
+        # Only now can /replay see the frame
+        segment.times.append(frame_time)
+        segment.offsets.append(offset)
+        segment.lengths.append(len(frame_bytes))
+
+    def _next_segment(self, start_time):
+        if self._data_file:
+            self._data_file.close()
+            self._index_file.close()
+        segment = Segment(self.folder, start_time)
+        self._data_file = open(segment.path, 'wb')
+        self._index_file = open(segment.index_path, 'wb')
+        with self._lock:
+            self.segments.append(segment)
+            old_segments = self.segments[:-self.max_segments]
+            del self.segments[:-self.max_segments]
+        for old in old_segments:
+            old.delete()
+        return segment
+
+    def frames_between(self, start_time, end_time):
+        """Yields (time, JPEG bytes) for every recorded frame from start_time to end_time."""
+        with self._lock:
+            segments = [s for s in self.segments if s.end_time >= start_time and s.start_time <= end_time]
+
+        for segment in segments:
+            # Map the file instead of reading it, so only the frames we send are touched
+            try:
+                with open(segment.path, 'rb') as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (FileNotFoundError, ValueError):
+                continue   # Deleted to make room, or still empty
+            with mapped:
+                i = bisect.bisect_left(segment.times, start_time)
+                while i < len(segment.times) and segment.times[i] <= end_time:
+                    offset, length = segment.offsets[i], segment.lengths[i]
+                    if offset + length > len(mapped):
+                        break   # Written after we mapped the file
+                    yield segment.times[i], mapped[offset:offset + length]
+                    i += 1
+
+
+recorder = None   # A SegmentRecorder once the server is running with recording on
+
+
+# A Unix time or a date and time like 2026-10-18T14:05 (local time)
+def parse_time(text):
+    try:
+        return float(text)
+    except ValueError:
+        return datetime.datetime.fromisoformat(text).timestamp()
+
+
+# Play recorded frames back at the speed they were taken (times speed)
+def generate_replay(start_time, end_time, speed):
+    first_time, started = None, time.monotonic()
+    for frame_time, frame_bytes in recorder.frames_between(start_time, end_time):
+        if first_time is None:
+            first_time = frame_time
+        time.sleep(max(0, started + (frame_time - first_time) / speed - time.monotonic()))
         yield (b'--frame\r\n'
                b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
 
-    cap.release()
-    print("Webcam released.")
+
+# Every viewer shares the same capture thread and encoded frames
+def generate_frames(fps=None, quality=None, scale=None):
+    return broadcaster.stream(fps, quality, scale)
 
 
+# Optional settings:  /video_feed?fps=10&quality=60&scale=2
 @app.route('/video_feed')
 def video_feed():
-    return Response(generate_frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
+    fps = request.args.get('fps', type=float)
+    quality = request.args.get('quality', type=int)
+    scale = request.args.get('scale', type=int)
+    if fps is not None:
+        fps = min(max(fps, 0.1), FRAMERATE)
+    if quality is not None:
+        quality = min(max(quality, 1), 100)
+    if scale is not None:
+        scale = min(max(scale, 1), 8)
+    return Response(generate_frames(fps, quality, scale), mimetype='multipart/x-mixed-replace; boundary=frame')
+
+
+# The newest frame as a single picture, without opening the webcam
+@app.route('/snapshot.jpg')
+def snapshot():
+    latest = broadcaster.latest_frame()
+    if latest is None:
+        return Response("No frame yet, open the video stream first.\n", status=503, mimetype='text/plain')
+    response = Response(latest[1], mimetype='image/jpeg')
+    response.last_modified = latest[2]
+    response.cache_control.no_cache = True
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+# Recorded video:  /replay?from=2026-10-18T14:00&to=2026-10-18T14:05&speed=2
+@app.route('/replay')
+def replay():
+    if recorder is None:
+        return Response("Recording is turned off.\n", status=404, mimetype='text/plain')
+    try:
+        start_time = parse_time(request.args['from'])
+        end_time = parse_time(request.args['to']) if 'to' in request.args else time.time()
+        speed = min(max(float(request.args.get('speed', 1)), 0.1), 100)
+    except (KeyError, ValueError):
+        return Response("Usage: /replay?from=<time>&to=<time>, as Unix times or like 2026-10-18T14:05\n",
+                        status=400, mimetype='text/plain')
+    return Response(generate_replay(start_time, end_time, speed), mimetype='multipart/x-mixed-replace; boundary=frame')
 
 
 @app.route('/')
@@ -104,4 +634,7 @@ def index():
     """
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=8080, debug=False)
+    if RECORDING or "--record" in sys.argv[1:]:
+        recorder = SegmentRecorder()
+        recorder.start(broadcaster)
+    app.run(host='0.0.0.0', port=8080, debug=False, threaded=True)
@@ -1,7 +1,7 @@
 # -------------------------------------------------------------------------------------
 # Network Related Bash Scripts
 # Jeffrey D. Shaffer
-# Updated -- 2025-12-24
+# Updated -- 2026-10-18
 #
 # Notes:
 #    - "connect_to_machine" takes in the machine name and user name, then
@@ -9,6 +9,9 @@
 #      it finally connects to the machine.
 #    - The individual "gomba" and "gomm" functions are to set the target
 #      machine name and login username
+#    - IP lookups now use get_ip.py, which caches answers for a few minutes
+#      and falls back to the last known IP when the IP-hub is down
+#      (get_ip.sh still works on machines without python3)
 #
 # -------------------------------------------------------------------------------------
 
@@ -17,7 +20,7 @@ alias sendIP="${HOME}/jds-programs/send_ip.sh"
 
 
 getIP(){
-    ${HOME}/jds-programs/get_ip.sh $1
+    python3 ${HOME}/jds-programs/get_ip.py "$@"
     }
 
 
@@ -63,7 +66,7 @@ ssh2machine(){
     local USER_NAME="$2"     # Use local
 
     echo " "
-    REMOTE_IP=$(${HOME}/jds-programs/get_ip.sh "${TARGET_HOST}" | tail -n 1)
+    REMOTE_IP=$(python3 ${HOME}/jds-programs/get_ip.py "${TARGET_HOST}" | tail -n 1)
     if [[ "$REMOTE_IP" =~ ^[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}$ ]]; then
         echo "Successfully retrieved IP for ${TARGET_HOST} from IP-Hub: ${REMOTE_IP}"
         echo " "
@@ -116,7 +119,7 @@ sftp2machine(){
     local USER_NAME="$2"
 
     echo " "
-    REMOTE_IP=$(${HOME}/jds-programs/get_ip.sh "${TARGET_HOST}" | tail -n 1)
+    REMOTE_IP=$(python3 ${HOME}/jds-programs/get_ip.py "${TARGET_HOST}" | tail -n 1)
     if [[ "$REMOTE_IP" =~ ^[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}$ ]]; then
         echo "Successfully retrieved IP for ${TARGET_HOST} from IP-Hub: ${REMOTE_IP}"
         echo " "
@@ -156,7 +159,7 @@ updatelocal() {
 
         "run")
             echo " "
-            REMOTE_IP=$(${HOME}/jds-programs/get_ip.sh "${DATA_HUB}" | tail -n 1)
+            REMOTE_IP=$(python3 ${HOME}/jds-programs/get_ip.py "${DATA_HUB}" | tail -n 1)
             if [[ "$REMOTE_IP" =~ ^[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}$ ]]; then
                 echo "Successfully retrieved IP for ${DATA_HUB} from IP-Hub: ${REMOTE_IP}"
             else
@@ -189,7 +192,7 @@ updatelocal() {
 
 
         "show")
-            REMOTE_IP=$(${HOME}/jds-programs/get_ip.sh "${DATA_HUB}" | tail -n 1)
+            REMOTE_IP=$(python3 ${HOME}/jds-programs/get_ip.py "${DATA_HUB}" | tail -n 1)
             echo " "
             echo "----------------------------------------------"
             echo "Displaying contents of jds-programs (RasPi)..."
@@ -223,7 +226,7 @@ updatelocal() {
 
         "test")
             echo " "
-            REMOTE_IP=$(${HOME}/jds-programs/get_ip.sh "${DATA_HUB}" | tail -n 1)
+            REMOTE_IP=$(python3 ${HOME}/jds-programs/get_ip.py "${DATA_HUB}" | tail -n 1)
             if [[ "$REMOTE_IP" =~ ^[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}$ ]]; then
                 echo "Successfully retrieved IP for ${DATA_HUB} from IP-Hub: ${REMOTE_IP}"
             else
@@ -1,7 +1,7 @@
 # ----------------------------------------------------------------------------------
 # Weather Related Bash Scripts
 # Jeffrey D. Shaffer
-# Updated -- 2026-01-11
+# Updated -- 2026-10-18
 #
 # Notes:
 #    - Many of these functions require a python venv named "getWX"
@@ -21,6 +21,13 @@
 #    - Fixed a bug where aqi and wx would not exit loop (missing return)
 #    - But aqi and wx in a pretty box for cosmetics
 #
+# 2026-10-18
+#    - Added "5) All" to aqi and wx, which shows the weather and air
+#      quality for all three places in one table (fetched at the same
+#      time by get_weather_aqi_multi.py, so it's about as quick as one)
+#    - Added "6) Forecast" to wx, the 7-day forecast for Shizuoka
+#      (hourly sparklines plus the daily table)
+#
 # ----------------------------------------------------------------------------------
 
 
@@ -34,9 +41,10 @@ aqi(){      # Get current air quality data from the web and calculate the AQI
         echo "|       2)  Osaka            |"
         echo "|       3)  Nara             |"
         echo "|       4)  Custom           |"
+        echo "|       5)  All              |"
         echo "'----------------------------'"
         echo
-        read -p "Choose 1-4 or Enter to quit: " choice
+        read -p "Choose 1-5 or Enter to quit: " choice
 
         case "$choice" in
             1)  # Shizuoka-shi
@@ -65,6 +73,12 @@ aqi(){      # Get current air quality data from the web and calculate the AQI
             	python3 ${HOME}/jds-programs/calculateAQIg.py $LATITUDE $LONGITUDE
             	deactivate
                 ;;
+
+            5) # Shizuoka, Osaka and Nara together
+            	source  ${HOME}/.venvs/getWX/bin/activate
+            	python3 ${HOME}/jds-programs/get_weather_aqi_multi.py
+            	deactivate
+                ;;
             *)
                 echo
                 return 0 ;;        esac
@@ -98,9 +112,11 @@ wx(){      # Get current air quality data from the web and calculate the AQI
         echo "|       2)  Osaka            |"
         echo "|       3)  Nara             |"
         echo "|       4)  Custom           |"
+        echo "|       5)  All              |"
+        echo "|       6)  Forecast         |"
         echo "'----------------------------'"
         echo
-        read -p "Choose 1-4 or Enter to quit: " choice
+        read -p "Choose 1-6 or Enter to quit: " choice
 
         case "$choice" in
             1)  # Shizuoka-shi
@@ -129,6 +145,18 @@ wx(){      # Get current air quality data from the web and calculate the AQI
             	python3 ${HOME}/jds-programs/get_weather_terminal.py $LATITUDE $LONGITUDE
             	deactivate
                 ;;
+
+            5) # Shizuoka, Osaka and Nara together
+            	source  ${HOME}/.venvs/getWX/bin/activate
+            	python3 ${HOME}/jds-programs/get_weather_aqi_multi.py
+            	deactivate
+                ;;
+
+            6) # Shizuoka, the next 7 days
+            	source  ${HOME}/.venvs/getWX/bin/activate
+            	python3 ${HOME}/jds-programs/get_weather_terminal.py --hourly --daily
+            	deactivate
+                ;;
             *)
                 echo
                 return 0 ;;